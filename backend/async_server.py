@@ -0,0 +1,131 @@
+"""Asyncio server mode for the hand gesture drawing backend.
+
+Serves the same REST endpoints and Socket.IO events as main.py, but on ASGI:
+the Flask routes from main.py are mounted through an ASGI adapter and the
+Socket.IO server is python-socketio's AsyncServer over native WebSocket.
+Frame processing and JPEG encoding run in thread pool executors, so the event
+loop only paces frames and fans them out to connected clients.
+
+    python async_server.py
+    uvicorn async_server:asgi_app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import socketio
+import uvicorn
+from asgiref.wsgi import WsgiToAsgi
+
+import main
+
+logger = logging.getLogger(__name__)
+
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+asgi_app = socketio.ASGIApp(sio, other_asgi_app=WsgiToAsgi(main.app))
+
+# One worker each: frames must be processed in order, and the stream loop
+# starts processing the next frame while the previous one is encoded
+process_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='process')
+encode_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='encode')
+stream_task = None
+
+# Importing this module is server startup, also under the uvicorn CLI
+main.warm_up_models()
+
+async def send_frame(result_frame, state):
+    """Encode a processed frame on the encode executor and emit it"""
+    loop = asyncio.get_running_loop()
+    payload = await loop.run_in_executor(encode_executor, main.encode_frame_update, result_frame, state)
+    await sio.emit('frame_update', payload)
+
+async def stream_frames():
+    """Stream frames via WebSocket, paced on absolute deadlines.
+
+    Frame N is encoded and sent while frame N+1 is processed. At most one
+    frame is in each stage, which is what the double-buffered display frame
+    in main.preprocess_frame allows.
+    """
+    loop = asyncio.get_running_loop()
+    scheduler = main.stream_scheduler
+    sending = None
+
+    scheduler.start()
+    try:
+        while main.streaming_active and main.camera_active:
+            try:
+                scheduler.tick(paced=main.replay is None)
+                result_frame, current_canvas = await loop.run_in_executor(process_executor, main.process_frame)
+                # The state this frame published, before the next frame replaces it
+                _, state = main.state_store.snapshot()
+
+                if sending is not None:
+                    await sending  # Keeps frames in order
+                    sending = None
+                if result_frame is not None:
+                    sending = asyncio.create_task(send_frame(result_frame, state))
+            except Exception as e:
+                logger.error(f"Streaming error: {e}")
+                main.streaming_active = False
+                await sio.emit('stream_status', {'active': False})
+                return
+
+            # Replays pace themselves
+            if main.replay is None:
+                await asyncio.sleep(scheduler.next_delay())
+            else:
+                await asyncio.sleep(0)
+
+        if sending is not None:
+            await sending
+    finally:
+        if sending is not None:
+            sending.cancel()
+
+    if not main.camera_active and main.streaming_active:
+        # The video source or replay ran out
+        main.streaming_active = False
+        await sio.emit('stream_status', {'active': False})
+
+@sio.on('connect')
+async def handle_connect(sid, environ):
+    logger.info('Client connected to WebSocket')
+
+@sio.on('disconnect')
+async def handle_disconnect(sid):
+    main.stream_rate.remove(sid)
+    logger.info('Client disconnected from WebSocket')
+
+@sio.on('start_stream')
+async def handle_start_stream(sid, data=None):
+    global stream_task
+    if main.camera_active and not main.streaming_active:
+        if stream_task is not None:
+            stream_task.cancel()  # A stream stopped a moment ago may still be in its loop
+        main.set_stream_fps(data)
+        main.streaming_active = True
+        logger.info('Starting WebSocket stream')
+        stream_task = asyncio.create_task(stream_frames())
+        await sio.emit('stream_status', {'active': True}, to=sid)
+
+@sio.on('client_stats')
+async def handle_client_stats(sid, data):
+    main.record_client_stats(sid, data or {})
+
+@sio.on('process_frame')
+async def handle_process_frame(sid, data):
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(None, main.landmarks_response, data or {})
+    await sio.emit('landmarks', response, to=sid)
+
+@sio.on('stop_stream')
+async def handle_stop_stream(sid):
+    main.streaming_active = False
+    logger.info('Stopping WebSocket stream')
+    await sio.emit('stream_status', {'active': False}, to=sid)
+
+if __name__ == '__main__':
+    logger.info("Starting Hand Gesture Drawing ASGI Server with WebSocket...")
+    logger.info("Same REST endpoints and WebSocket events as main.py")
+
+    uvicorn.run(asgi_app, host='0.0.0.0', port=5000)
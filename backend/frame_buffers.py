@@ -0,0 +1,42 @@
+"""Scratch arrays reused across frames by the streaming pipeline.
+
+Every OpenCV call in process_frame that produces a full-frame image writes
+into one of these through its dst= argument instead of allocating a fresh
+array, so a 640x480 stream no longer allocates and page-faults in several
+fresh 900 KB buffers per frame. Arrays are reallocated only when the frame
+size changes.
+
+    frame = cv2.flip(image, 1, dst=buffers.get('frame', image.shape))
+
+With pooled=False get() returns None, which makes OpenCV allocate as usual;
+benchmarks/frame_allocations.py uses that to compare both.
+"""
+import numpy as np
+
+
+class FrameBuffers:
+    """Named preallocated arrays for one stream"""
+
+    def __init__(self, pooled=True):
+        self.pooled = pooled
+        self.arrays = {}
+        self.turns = {}
+
+    def get(self, name, shape, dtype=np.uint8, copies=1):
+        """Array for `name`, or None when not pooling.
+
+        copies > 1 hands out that many arrays in turn, for outputs that are
+        still being read (e.g. JPEG-encoded) while the next frame is made.
+        """
+        if not self.pooled:
+            return None
+        ring = self.arrays.get(name)
+        if ring is None or ring[0].shape != shape or ring[0].dtype != dtype or len(ring) != copies:
+            ring = self.arrays[name] = [np.empty(shape, dtype=dtype) for _ in range(copies)]
+            self.turns[name] = 0
+        turn = self.turns[name]
+        self.turns[name] = (turn + 1) % copies
+        return ring[turn]
+
+    def nbytes(self):
+        return sum(array.nbytes for ring in self.arrays.values() for array in ring)
@@ -0,0 +1,176 @@
+"""Drift-free frame pacing for the streaming loops.
+
+FrameScheduler ticks on absolute deadlines (start + n * period) instead of
+sleeping "period minus elapsed" after each frame, so timing errors don't
+accumulate. When a frame overruns, the missed deadlines are skipped rather
+than queued, and counted as deadline misses.
+
+    scheduler.start()
+    while streaming:
+        scheduler.tick()
+        ...process and emit a frame...
+        time.sleep(scheduler.next_delay())   # or: await asyncio.sleep(...)
+
+AdaptiveRate moves the target FPS down when clients report dropped frames
+or slow decodes, and back up once they keep up again.
+"""
+import math
+import threading
+import time
+from collections import deque
+
+WINDOW = 120  # Ticks kept for jitter and effective FPS
+MAX_FPS = 120.0  # Highest target FPS accepted
+
+
+class FrameScheduler:
+    """Paces a stream at a target FPS and keeps timing metrics"""
+
+    def __init__(self, target_fps=30, clock=time.perf_counter):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.set_target_fps(target_fps)
+        self.start()
+
+    def set_target_fps(self, target_fps):
+        if not math.isfinite(target_fps) or not 0 < target_fps <= MAX_FPS:
+            raise ValueError(f'target_fps must be in (0, {MAX_FPS:g}]')
+        self.target_fps = target_fps
+        self.period = 1.0 / target_fps
+
+    def start(self):
+        """Reset the deadline and metrics at the start of a stream"""
+        with self.lock:
+            self.deadline = self.clock()
+            self.frames = 0
+            self.deadline_misses = 0
+            self.tick_times = deque(maxlen=WINDOW)
+            self.lateness = deque(maxlen=WINDOW)
+
+    def tick(self, paced=True):
+        """Mark the start of a frame, recording how late it is against its deadline.
+
+        Sources that pace themselves (replays) pass paced=False: their frames
+        have no deadline to be late for, so the deadline just follows them.
+        """
+        now = self.clock()
+        with self.lock:
+            self.frames += 1
+            self.tick_times.append(now)
+            if paced:
+                self.lateness.append(max(0.0, now - self.deadline))
+            else:
+                self.deadline = now
+
+    def next_delay(self):
+        """Advance to the next deadline that is still ahead and return the seconds until it"""
+        now = self.clock()
+        with self.lock:
+            self.deadline += self.period
+            if now > self.deadline:
+                missed = int((now - self.deadline) // self.period) + 1
+                self.deadline_misses += missed
+                self.deadline += missed * self.period
+            return self.deadline - now
+
+    def metrics(self):
+        with self.lock:
+            ticks = list(self.tick_times)
+            lateness = list(self.lateness)
+            frames = self.frames
+            deadline_misses = self.deadline_misses
+
+        effective_fps = 0.0
+        if len(ticks) > 1 and ticks[-1] > ticks[0]:
+            effective_fps = (len(ticks) - 1) / (ticks[-1] - ticks[0])
+        return {
+            'target_fps': self.target_fps,
+            'effective_fps': round(effective_fps, 2),
+            'frames': frames,
+            'deadline_misses': deadline_misses,
+            'jitter_ms': round(1000 * sum(lateness) / len(lateness), 3) if lateness else 0.0,
+            'max_jitter_ms': round(1000 * max(lateness), 3) if lateness else 0.0,
+        }
+
+
+class AdaptiveRate:
+    """Adjusts a FrameScheduler's target FPS from client render reports.
+
+    Clients report how many frames they rendered and dropped and how long a
+    decode takes. When any recent client drops more than drop_threshold of
+    its frames, or needs more than the frame period to decode, the target is
+    cut multiplicatively; when all of them keep up it climbs back by step_up
+    per interval, never above max_fps.
+    """
+
+    def __init__(self, scheduler, max_fps=None, min_fps=5.0, drop_threshold=0.1,
+                 backoff=0.8, step_up=1.0, interval=1.0, stale_after=5.0, clock=time.monotonic):
+        self.scheduler = scheduler
+        self.max_fps = max_fps or scheduler.target_fps
+        self.min_fps = min_fps
+        self.drop_threshold = drop_threshold
+        self.backoff = backoff
+        self.step_up = step_up
+        self.interval = interval
+        self.stale_after = stale_after
+        self.clock = clock
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.clients = {}
+        self.last_update = 0.0
+
+    def set_max_fps(self, fps):
+        """Set the ceiling (e.g. a user-requested FPS) and jump to it"""
+        self.scheduler.set_target_fps(fps)
+        with self.lock:
+            self.max_fps = fps
+
+    def report(self, client_id, fps=0.0, decode_ms=0.0, rendered=0, dropped=0):
+        with self.lock:
+            self.clients[client_id] = {
+                'fps': float(fps),
+                'decode_ms': float(decode_ms),
+                'rendered': int(rendered),
+                'dropped': int(dropped),
+                'time': self.clock(),
+            }
+        self.update()
+
+    def remove(self, client_id):
+        with self.lock:
+            self.clients.pop(client_id, None)
+
+    def update(self):
+        """Apply one backoff or recovery step, at most once per interval"""
+        now = self.clock()
+        with self.lock:
+            if not self.enabled or now - self.last_update < self.interval:
+                return
+            recent = [c for c in self.clients.values() if now - c['time'] < self.stale_after]
+            if not recent:
+                return
+            self.last_update = now
+
+            target = self.scheduler.target_fps
+            period_ms = 1000.0 / target
+            overloaded = any(
+                c['dropped'] > self.drop_threshold * (c['rendered'] + c['dropped'])
+                or c['decode_ms'] > period_ms
+                for c in recent
+            )
+            if overloaded:
+                target = target * self.backoff
+            else:
+                target = target + self.step_up
+            # The requested FPS caps the rate even when it is below min_fps
+            target = min(self.max_fps, max(self.min_fps, target))
+            self.scheduler.set_target_fps(target)
+
+    def metrics(self):
+        now = self.clock()
+        with self.lock:
+            clients = [
+                {key: value for key, value in c.items() if key != 'time'}
+                for c in self.clients.values() if now - c['time'] < self.stale_after
+            ]
+            return {'adaptive': self.enabled, 'max_fps': self.max_fps, 'clients': clients}
@@ -2,12 +2,25 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 import cv2
-import mediapipe as mp
 import numpy as np
 import time
 import base64
 import threading
 import logging
+import os
+import sys
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from recording import LandmarkRecorder, LandmarkReplay
+from video_sources import open_source
+from frame_scheduler import FrameScheduler, AdaptiveRate
+from state_store import StateStore
+from frame_buffers import FrameBuffers
+from hand_tracking import HandTracker, hand_label
+from gestures import GestureTable, load_gestures, pinch_size, undo, UNDO_DEPTH
+from brush import make_brushes
+from model_loader import LazyHands, draw_landmarks
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -22,47 +35,88 @@ camera = None
 canvas = None
 camera_active = False
 streaming_active = False
+stream_thread = None
+stream_start_lock = threading.Lock()
+recorder = None
+replay = None
 drawing_state = {
     'gesture': 'Ready',
     'color': 'Red',
     'color_index': 0,
     'brush_size': 5,
     'drawing': False,
-    'prev_x': 0,
-    'prev_y': 0,
-    'last_thumb_time': 0
+    'last_thumb_time': 0,
+    'hands': [],
+    'captured_at': 0.0  # Wall-clock read time of the frame, sent to clients for latency
 }
+# Brush settings a new hand starts with, taken from drawing_state
+SHARED_BRUSH_KEYS = ('color', 'color_index', 'brush_size', 'last_thumb_time')
+
+# Hands tracked at once: 2 for both hands of one user, more for several users
+MAX_NUM_HANDS = int(os.environ.get('GESTURE_MAX_HANDS', 1))
+
+CAMERA_WIDTH = 640  # Reduced resolution
+CAMERA_HEIGHT = 480
+# Hands can run on a smaller copy of the display frame, e.g. '320x240'
+INFERENCE_SIZE = tuple(int(v) for v in os.environ.get('GESTURE_INFERENCE_SIZE', f'{CAMERA_WIDTH}x{CAMERA_HEIGHT}').split('x'))
 
-# Mediapipe setup
-mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
-hands = mp_hands.Hands(
+# Mediapipe setup - models are built and warmed up in the background by
+# warm_up_models(), or on first use
+hands = LazyHands(
+    warmup_size=INFERENCE_SIZE,
     static_image_mode=False,
-    max_num_hands=1, 
+    max_num_hands=MAX_NUM_HANDS, 
     min_detection_confidence=0.8,
     min_tracking_confidence=0.7
 )
+# Browser capture mode: frames from many clients arrive interleaved, so run
+# detection on every frame instead of tracking across frames
+browser_hands = LazyHands(
+    warmup_size=(320, 240),
+    static_image_mode=True,
+    max_num_hands=MAX_NUM_HANDS,
+    min_detection_confidence=0.8
+)
+browser_hands_lock = threading.Lock()
 
 # Settings
 colors = [(0, 0, 255), (0, 255, 0), (255, 0, 0), (0, 0, 0), (0, 255, 255), (0, 165, 255)]
 color_names = ["Red", "Green", "Blue", "Black", "Yellow", "Orange"]
-min_thickness = 1
-max_thickness = 50
-eraser_size = 30
-CAMERA_WIDTH = 640  # Reduced resolution
-CAMERA_HEIGHT = 480
 JPEG_QUALITY = 70  # Lower quality for smaller data size
+# Webcam index, video file, image folder, 'synthetic' or tcp://host:port
+VIDEO_SOURCE = os.environ.get('GESTURE_VIDEO_SOURCE', '0')
+TARGET_FPS = 30
+MODEL_READY_TIMEOUT = 10.0  # Max seconds start_camera waits for a loading model
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'recordings')
 
-def get_fingers_up(lm_list):
-    """Simple finger detection for right hand"""
+stream_scheduler = FrameScheduler(TARGET_FPS)
+# Lowers the stream FPS while clients report dropped frames; GESTURE_ADAPTIVE_FPS=0 disables it
+stream_rate = AdaptiveRate(stream_scheduler)
+stream_rate.enabled = os.environ.get('GESTURE_ADAPTIVE_FPS', '1') != '0'
+hand_tracker = HandTracker(MAX_NUM_HANDS)
+# drawing_state, canvas and hand_tracker belong to the frame loop; handlers
+# read state_store snapshots and submit changes as commands
+state_store = StateStore(drawing_state)
+frame_buffers = FrameBuffers()
+# Canvases to go back to with the undo gesture, newest last
+undo_history = deque(maxlen=UNDO_DEPTH)
+
+def warm_up_models():
+    """Load both Hands models in the background so the first frame is fast"""
+    hands.warm_up()
+    browser_hands.warm_up()
+
+def get_fingers_up(lm_list, handedness='Right'):
+    """Simple finger detection, mirrored thumb rule for the left hand"""
     if len(lm_list) < 21:
         return [0, 0, 0, 0, 0]
     
     fingers = []
-    if lm_list[4][0] < lm_list[3][0]:
-        fingers.append(1)
+    if handedness == 'Right':
+        thumb_up = lm_list[4][0] < lm_list[3][0]
     else:
-        fingers.append(0)
+        thumb_up = lm_list[4][0] > lm_list[3][0]
+    fingers.append(1 if thumb_up else 0)
     
     for tip in [8, 12, 16, 20]:
         if lm_list[tip][1] < lm_list[tip-2][1]:
@@ -72,10 +126,6 @@ def get_fingers_up(lm_list):
     
     return fingers
 
-def distance(p1, p2):
-    """Calculate distance between two points"""
-    return int(((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)**0.5)
-
 def select_color(x, y):
     """Check if touching color palette"""
     if 20 <= y <= 70:
@@ -85,9 +135,224 @@ def select_color(x, y):
                 return i
     return None
 
+def push_undo():
+    """Save the canvas before a stroke or erase changes it"""
+    if canvas is not None:
+        undo_history.append(canvas.copy())
+
+# Gesture actions, called with (gesture, hand state, frame, index tip, thumb tip,
+# frame time) and returning (status label, whether the hand is drawing)
+def draw_action(gesture, hand_state, frame, point, thumb, frame_time):
+    x, y = point
+    label = 'Drawing'
+    drawing = False
+    selected_color_index = select_color(x, y)
+    if selected_color_index is not None:
+        hand_state['color_index'] = selected_color_index
+        hand_state['color'] = color_names[selected_color_index]
+        label = f'Color: {color_names[selected_color_index]}'
+    else:
+        brush_color = colors[hand_state['color_index']]
+        brush = brushes[gesture.name]
+        if hand_state['drawing']:
+            hand_state['stroke'] = brush.stroke(canvas, hand_state['stroke'], point, thumb,
+                                                hand_state['brush_size'], frame_time, brush_color)
+        else:
+            push_undo()
+            hand_state['stroke'] = brush.start(point, thumb, hand_state['brush_size'], frame_time)
+            hand_state['drawing'] = True
+        drawing = True
+    
+    cv2.circle(frame, (x, y), hand_state['brush_size'], 
+             colors[hand_state['color_index']], -1)
+    return label, drawing
+
+def hover_action(gesture, hand_state, frame, point, thumb, frame_time):
+    x, y = point
+    cv2.circle(frame, (x, y), hand_state['brush_size'], (255, 255, 255), 2)
+    cv2.putText(frame, "HOVER", (x+20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)
+    return 'Hover', False
+
+def erase_action(gesture, hand_state, frame, point, thumb, frame_time):
+    x, y = point
+    size = gesture.params['size']
+    if hand_state['action'] != 'erase':
+        push_undo()
+    cv2.circle(canvas, (x, y), size, (255, 255, 255), -1)
+    cv2.circle(frame, (x, y), size, (0, 255, 255), 2)
+    cv2.putText(frame, "ERASE", (x+20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,255), 2)
+    return 'Erasing', False
+
+def resize_action(gesture, hand_state, frame, point, thumb, frame_time):
+    x, y = point
+    hand_state['brush_size'] = pinch_size(gesture, point, thumb)
+    cv2.circle(frame, (x, y), hand_state['brush_size'], 
+             colors[hand_state['color_index']], 2)
+    cv2.putText(frame, f"SIZE: {hand_state['brush_size']}", (x+20, y), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,0), 2)
+    return 'Adjusting Size', False
+
+def next_color_action(gesture, hand_state, frame, point, thumb, frame_time):
+    x, y = point
+    label = 'Ready'
+    if frame_time - hand_state['last_thumb_time'] > gesture.cooldown:
+        hand_state['color_index'] = (hand_state['color_index'] + 1) % len(colors)
+        hand_state['color'] = color_names[hand_state['color_index']]
+        hand_state['last_thumb_time'] = frame_time
+        label = f'Next Color: {hand_state["color"]}'
+    next_color_idx = (hand_state['color_index'] + 1) % len(colors)
+    cv2.putText(frame, f"NEXT: {color_names[next_color_idx]}", 
+               (x+20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,255), 2)
+    return label, False
+
+def undo_action(gesture, hand_state, frame, point, thumb, frame_time):
+    x, y = point
+    label = 'Ready'
+    if frame_time - hand_state['last_undo_time'] > gesture.cooldown and undo(canvas, undo_history):
+        hand_state['last_undo_time'] = frame_time
+        label = 'Undo'
+    cv2.putText(frame, f"UNDO ({len(undo_history)})", (x+20, y), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)
+    return label, False
+
+# Finger pattern -> action, compiled once from gestures.json (or GESTURE_CONFIG)
+gesture_table = GestureTable(load_gestures(), {
+    'draw': draw_action,
+    'hover': hover_action,
+    'erase': erase_action,
+    'resize': resize_action,
+    'next_color': next_color_action,
+    'undo': undo_action
+})
+brushes = make_brushes(gesture_table.gestures)
+
+def classify_gesture(fingers):
+    """(action, settings) for a finger pattern, as used by browser capture clients.
+    
+    The settings are the gesture's cooldown and size parameters; the browser
+    draws with its own brush, so a draw gesture's brush config is left out.
+    """
+    gesture, _ = gesture_table.lookup(fingers)
+    if gesture is None:
+        return 'none', {}
+    params = {key: value for key, value in gesture.params.items() if key != 'brush'}
+    return gesture.action, dict(params, cooldown=gesture.cooldown)
+
+def detect_landmarks(frame_data):
+    """Detect hands in a browser-captured JPEG (bytes or data URL).
+    
+    The browser mirrors and downscales the frame and keeps all drawing state,
+    so nothing is kept here between frames.
+    """
+    if isinstance(frame_data, str):
+        frame_data = base64.b64decode(frame_data.split(',', 1)[-1])
+    frame = cv2.imdecode(np.frombuffer(frame_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return None
+    
+    h, w = frame.shape[:2]
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    with browser_hands_lock:
+        results = browser_hands.process(rgb)
+    
+    hands_found = []
+    for i, hand_landmarks in enumerate(results.multi_hand_landmarks or []):
+        handedness = hand_label(results, i)
+        lm_list = [(int(lm.x * w), int(lm.y * h)) for lm in hand_landmarks.landmark]
+        fingers = get_fingers_up(lm_list, handedness)
+        action, params = classify_gesture(fingers)
+        hands_found.append({
+            'hand': handedness,
+            'landmarks': [[round(lm.x, 4), round(lm.y, 4)] for lm in hand_landmarks.landmark],
+            'fingers': fingers,
+            'gesture': action,
+            'params': params
+        })
+    return hands_found
+
+def landmarks_response(data):
+    """Build the 'landmarks' reply for a process_frame request"""
+    try:
+        hands_found = detect_landmarks(data.get('frame', b''))
+    except Exception as e:
+        logger.error(f'Landmark detection error: {e}')
+        hands_found = None
+    
+    if hands_found is None:
+        return {'id': data.get('id'), 'hands': [], 'error': 'Invalid frame'}
+    return {'id': data.get('id'), 'hands': hands_found}
+
+def preprocess_frame(frame):
+    """Mirrored BGR display frame and RGB inference image for a camera frame.
+    
+    One pass per output where possible: the resize is skipped when the source
+    already has the display size, the flip writes straight into the output
+    buffer and the channel swap runs once, on the (possibly smaller)
+    inference image. The display frame is double-buffered because the
+    encoder may still be reading the previous one.
+    """
+    shape = (CAMERA_HEIGHT, CAMERA_WIDTH, 3)
+    if frame.shape != shape:
+        frame = cv2.resize(frame, (CAMERA_WIDTH, CAMERA_HEIGHT), dst=frame_buffers.get('resized', shape))
+    display = cv2.flip(frame, 1, dst=frame_buffers.get('frame', shape, copies=2))
+    
+    inference_shape = (INFERENCE_SIZE[1], INFERENCE_SIZE[0], 3)
+    if inference_shape != shape:
+        display_small = cv2.resize(display, INFERENCE_SIZE, dst=frame_buffers.get('small', inference_shape),
+                                   interpolation=cv2.INTER_AREA)
+    else:
+        display_small = display
+    rgb = cv2.cvtColor(display_small, cv2.COLOR_BGR2RGB, dst=frame_buffers.get('rgb', inference_shape))
+    return display, rgb
+
+def recording_path(name):
+    """Path of a recording name inside RECORDINGS_DIR, or None if it isn't a plain file name"""
+    # The server must not read or write anywhere a client asks
+    if not isinstance(name, str) or os.path.basename(name) != name or name.startswith('.'):
+        return None
+    if not name.endswith('.npz'):
+        name += '.npz'
+    return os.path.join(RECORDINGS_DIR, name)
+
+def new_hand_state():
+    """Brush and stroke state for a newly detected hand"""
+    state = {key: drawing_state[key] for key in SHARED_BRUSH_KEYS}
+    state.update(drawing=False, stroke=None, action=None, last_undo_time=0)
+    return state
+
+def apply_color(color_index):
+    """Command: switch every hand to a palette color"""
+    drawing_state['color_index'] = color_index
+    drawing_state['color'] = color_names[color_index]
+    hand_tracker.set_all(color_index=color_index, color=color_names[color_index])
+
+def reset_canvas():
+    """Command: start over with a blank canvas at the next frame's size"""
+    global canvas
+    push_undo()
+    canvas = None
+
+def reset_session():
+    """Command: blank canvas and forget tracked hands, for a new camera or replay"""
+    reset_canvas()
+    undo_history.clear()
+    hand_tracker.reset()
+
 def process_frame():
-    """Process camera frame and detect hand gestures"""
-    global canvas, drawing_state
+    """Process camera frame and detect hand gestures.
+    
+    Pending commands run first, and the resulting state is published once
+    the frame is done, so handlers never see a half-updated frame.
+    """
+    with state_store.frame_lock:
+        state_store.run_pending()
+        result = process_camera_frame()
+        state_store.publish()
+    return result
+
+def process_camera_frame():
+    """Read, analyze and draw one frame; call through process_frame"""
+    global canvas, drawing_state, camera_active
     
     start_time = time.time()
     
@@ -97,105 +362,82 @@ def process_frame():
     
     ret, frame = camera.read()
     if not ret:
-        logger.error("Failed to read frame from camera")
+        if not camera.isOpened():
+            # A replay, or a video file or image folder without loop, has run out
+            logger.info("Video source finished")
+            camera_active = False
+        else:
+            logger.error("Failed to read frame from camera")
         return None, None
     
-    # Resize frame
-    frame = cv2.resize(frame, (CAMERA_WIDTH, CAMERA_HEIGHT))
-    frame = cv2.flip(frame, 1)
+    drawing_state['captured_at'] = start_time
+    
+    # Recorded time when replaying so time-based gestures are deterministic
+    frame_time = replay.timestamp if replay is not None else start_time
+    
+    # Landmarks are normalized, so they map onto the display frame at any inference size
+    frame, rgb = preprocess_frame(frame)
     h, w = frame.shape[:2]
     
     if canvas is None:
-        canvas = np.ones((h, w, 3), dtype=np.uint8) * 255
+        canvas = np.full((h, w, 3), 255, dtype=np.uint8)
     
     # Process frame only if hands are detected
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb)
+    results = replay.process(rgb) if replay is not None else hands.process(rgb)
+    # start/stop_recording swap recorder under frame_lock, so it is stable for this frame
+    frame_recorder = recorder
+    if frame_recorder is not None:
+        frame_recorder.add(frame_time, results)
     
-    current_drawing = False
-    current_gesture = 'Ready'
+    tracked_hands = hand_tracker.update(results, new_hand_state)
+    hands_info = []
     
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            lm_list = []
-            for lm in hand_landmarks.landmark:
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                lm_list.append((cx, cy))
-            
-            fingers = get_fingers_up(lm_list)
-            fingers_count = sum(fingers)
-            
-            if len(lm_list) >= 21:
-                x, y = lm_list[8]
-                thumb_x, thumb_y = lm_list[4]
-                
-                if fingers == [0, 1, 0, 0, 0]:
-                    current_gesture = 'Drawing'
-                    selected_color_index = select_color(x, y)
-                    if selected_color_index is not None:
-                        drawing_state['color_index'] = selected_color_index
-                        drawing_state['color'] = color_names[selected_color_index]
-                        current_gesture = f'Color: {color_names[selected_color_index]}'
-                    else:
-                        brush_color = colors[drawing_state['color_index']]
-                        if drawing_state['drawing']:
-                            cv2.line(canvas, (drawing_state['prev_x'], drawing_state['prev_y']), 
-                                   (x, y), brush_color, drawing_state['brush_size'])
-                        else:
-                            drawing_state['drawing'] = True
-                        
-                        drawing_state['prev_x'], drawing_state['prev_y'] = x, y
-                        current_drawing = True
-                    
-                    cv2.circle(frame, (x, y), drawing_state['brush_size'], 
-                             colors[drawing_state['color_index']], -1)
-                
-                elif fingers == [0, 1, 1, 0, 0]:
-                    current_gesture = 'Hover'
-                    cv2.circle(frame, (x, y), drawing_state['brush_size'], (255, 255, 255), 2)
-                    cv2.putText(frame, "HOVER", (x+20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)
-                
-                elif fingers_count == 5:
-                    current_gesture = 'Erasing'
-                    cv2.circle(canvas, (x, y), eraser_size, (255, 255, 255), -1)
-                    cv2.circle(frame, (x, y), eraser_size, (0, 255, 255), 2)
-                    cv2.putText(frame, "ERASE", (x+20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,255), 2)
-                
-                elif fingers == [1, 1, 0, 0, 0] and fingers_count == 2:
-                    current_gesture = 'Adjusting Size'
-                    pinch_distance = distance((thumb_x, thumb_y), (x, y))
-                    new_thickness = max(min_thickness, min(max_thickness, pinch_distance // 2))
-                    drawing_state['brush_size'] = new_thickness
-                    cv2.circle(frame, (x, y), drawing_state['brush_size'], 
-                             colors[drawing_state['color_index']], 2)
-                    cv2.putText(frame, f"SIZE: {drawing_state['brush_size']}", (x+20, y), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,0), 2)
-                
-                elif fingers_count == 0:
-                    current_time = time.time()
-                    if current_time - drawing_state['last_thumb_time'] > 1.0:
-                        drawing_state['color_index'] = (drawing_state['color_index'] + 1) % len(colors)
-                        drawing_state['color'] = color_names[drawing_state['color_index']]
-                        drawing_state['last_thumb_time'] = current_time
-                        current_gesture = f'Next Color: {drawing_state["color"]}'
-                    next_color_idx = (drawing_state['color_index'] + 1) % len(colors)
-                    cv2.putText(frame, f"NEXT: {color_names[next_color_idx]}", 
-                               (x+20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,255), 2)
-            
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-    
-    if not current_drawing and drawing_state['drawing']:
-        drawing_state['drawing'] = False
+    for hand_id, hand_landmarks, handedness, hand_state in tracked_hands:
+        lm_list = []
+        for lm in hand_landmarks.landmark:
+            cx, cy = int(lm.x * w), int(lm.y * h)
+            lm_list.append((cx, cy))
+        
+        fingers = get_fingers_up(lm_list, handedness)
+        gesture, action = gesture_table.lookup(fingers)
+        
+        current_drawing = False
+        current_gesture = 'Ready'
+        
+        if len(lm_list) >= 21 and action is not None:
+            current_gesture, current_drawing = action(
+                gesture, hand_state, frame, lm_list[8], lm_list[4], frame_time
+            )
+        hand_state['action'] = gesture.action if gesture is not None else None
+        
+        draw_landmarks(frame, hand_landmarks)
+        
+        if not current_drawing:
+            hand_state['drawing'] = False
+        
+        hands_info.append({
+            'id': hand_id,
+            'hand': handedness,
+            'gesture': current_gesture,
+            'color': hand_state['color'],
+            'brush_size': hand_state['brush_size'],
+            'drawing': hand_state['drawing']
+        })
     
-    drawing_state['gesture'] = current_gesture
+    # The longest-tracked hand's brush is the one shown in the UI and
+    # inherited by hands that appear later
+    if tracked_hands:
+        for key in SHARED_BRUSH_KEYS:
+            drawing_state[key] = tracked_hands[0][3][key]
     
-    gray = cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY)
-    _, mask = cv2.threshold(gray, 250, 255, cv2.THRESH_BINARY)
-    mask_inv = cv2.bitwise_not(mask)
+    drawing_state['drawing'] = any(info['drawing'] for info in hands_info)
+    drawing_state['gesture'] = ' | '.join(info['gesture'] for info in hands_info) or 'Ready'
+    drawing_state['hands'] = hands_info
     
-    frame_bg = cv2.bitwise_and(frame, frame, mask=mask)
-    canvas_fg = cv2.bitwise_and(canvas, canvas, mask=mask_inv)
-    result = cv2.add(frame_bg, canvas_fg)
+    # Overlay the strokes (non-white canvas pixels) onto the camera frame in place
+    gray = cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY, dst=frame_buffers.get('gray', (h, w)))
+    _, mask_inv = cv2.threshold(gray, 250, 255, cv2.THRESH_BINARY_INV, dst=frame_buffers.get('mask', (h, w)))
+    result = cv2.copyTo(canvas, mask_inv, frame)
     
     for i, color in enumerate(colors):
         x = 20 + i * 60
@@ -213,38 +455,54 @@ def process_frame():
     
     return result, canvas
 
+def encode_frame_update(result_frame, state=None):
+    """Encode a processed frame and the drawing state as a frame_update payload.
+    
+    `state` is the snapshot published with the frame; the current one by default.
+    """
+    if state is None:
+        _, state = state_store.snapshot()
+    _, buffer = cv2.imencode('.jpg', result_frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    frame_base64 = base64.b64encode(buffer).decode('utf-8')
+    
+    logger.debug(f"Emitting frame_update: gesture={state['gesture']}, color={state['color']}, frame_size={len(frame_base64)}")
+    return {
+        'frame': f'data:image/jpeg;base64,{frame_base64}',
+        'timestamp': state['captured_at'],
+        'state': {
+            'gesture': state['gesture'],
+            'color': state['color'],
+            'brush_size': state['brush_size'],
+            'drawing': state['drawing']
+        }
+    }
+
 def stream_frames():
     """Stream frames via WebSocket"""
     global streaming_active
     
+    stream_scheduler.start()
     while streaming_active and camera_active:
         try:
-            start_time = time.time()
+            stream_scheduler.tick(paced=replay is None)
             result_frame, current_canvas = process_frame()
             
             if result_frame is not None:
-                _, buffer = cv2.imencode('.jpg', result_frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
-                frame_base64 = base64.b64encode(buffer).decode('utf-8')
-                
-                logger.debug(f"Emitting frame_update: gesture={drawing_state['gesture']}, color={drawing_state['color']}, frame_size={len(frame_base64)}")
-                socketio.emit('frame_update', {
-                    'frame': f'data:image/jpeg;base64,{frame_base64}',
-                    'state': {
-                        'gesture': drawing_state['gesture'],
-                        'color': drawing_state['color'],
-                        'brush_size': drawing_state['brush_size'],
-                        'drawing': drawing_state['drawing']
-                    }
-                })
+                socketio.emit('frame_update', encode_frame_update(result_frame))
             
-            elapsed = (time.time() - start_time) * 1000
-            sleep_time = max(0, (33 - elapsed) / 1000)  # Target ~30 FPS
-            time.sleep(sleep_time)
+            # Replays pace themselves
+            if replay is None:
+                time.sleep(stream_scheduler.next_delay())
         except Exception as e:
             logger.error(f"Streaming error: {e}")
             streaming_active = False
             socketio.emit('stream_status', {'active': False})
             break
+    
+    if not camera_active and streaming_active:
+        # The video source or replay ran out
+        streaming_active = False
+        socketio.emit('stream_status', {'active': False})
 
 @socketio.on('connect')
 def handle_connect():
@@ -252,18 +510,35 @@ def handle_connect():
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    stream_rate.remove(request.sid)
     logger.info('Client disconnected from WebSocket')
 
+def set_stream_fps(data):
+    """Apply an optional {'fps': n} from a start_stream request"""
+    fps = (data or {}).get('fps')
+    if fps is None:
+        return
+    try:
+        stream_rate.set_max_fps(float(fps))
+        logger.info(f'Stream target FPS set to {fps}')
+    except (TypeError, ValueError):
+        logger.warning(f'Invalid FPS requested: {fps}')
+
 @socketio.on('start_stream')
-def handle_start_stream():
-    global streaming_active
-    if camera_active and not streaming_active:
-        streaming_active = True
-        logger.info('Starting WebSocket stream')
-        thread = threading.Thread(target=stream_frames)
-        thread.daemon = True
-        thread.start()
-        emit('stream_status', {'active': True})
+def handle_start_stream(data=None):
+    global streaming_active, stream_thread
+    with stream_start_lock:
+        if camera_active and not streaming_active:
+            # A stream stopped a moment ago may still be in its loop; two would double the emits
+            if stream_thread is not None:
+                stream_thread.join(timeout=5.0)
+            set_stream_fps(data)
+            streaming_active = True
+            logger.info('Starting WebSocket stream')
+            stream_thread = threading.Thread(target=stream_frames)
+            stream_thread.daemon = True
+            stream_thread.start()
+            emit('stream_status', {'active': True})
 
 @socketio.on('stop_stream')
 def handle_stop_stream():
@@ -272,23 +547,70 @@ def handle_stop_stream():
     logger.info('Stopping WebSocket stream')
     emit('stream_status', {'active': False})
 
+def record_client_stats(client_id, data):
+    """Feed a client's {fps, decode_ms, rendered, dropped} report to the rate controller"""
+    stats = {key: data[key] for key in ('fps', 'decode_ms', 'rendered', 'dropped') if key in data}
+    try:
+        stream_rate.report(client_id, **stats)
+    except (TypeError, ValueError):
+        logger.warning(f'Invalid client stats: {data}')
+
+@socketio.on('client_stats')
+def handle_client_stats(data):
+    record_client_stats(request.sid, data or {})
+
+@socketio.on('process_frame')
+def handle_process_frame(data):
+    """Browser capture mode: reply with the landmarks of one frame"""
+    emit('landmarks', landmarks_response(data or {}))
+
 @app.route('/api/start_camera', methods=['POST'])
 def start_camera():
-    """Initialize and start the camera"""
-    global camera, camera_active, canvas
+    """Initialize and start the camera, or replay a landmark recording from RECORDINGS_DIR"""
+    global camera, camera_active, replay
+    
+    data = request.get_json(silent=True) or {}
     
     try:
+        if data.get('replay'):
+            path = recording_path(data['replay'])
+            if path is None:
+                return jsonify({'error': 'Invalid recording name', 'details': 'Give a file name in the recordings directory'}), 400
+            if camera is not None:
+                camera.release()
+            replay = LandmarkReplay(path, speed=float(data.get('speed', 1.0)),
+                                    loop=bool(data.get('loop', False)))
+            camera = replay
+            camera_active = True
+            state_store.submit(reset_session)
+            logger.info(f"Replaying {data['replay']} ({len(replay.timestamps)} frames)")
+            
+            return jsonify({
+                'status': 'Replay started successfully',
+                'active': True,
+                'frames': len(replay.timestamps)
+            })
+        
+        # The model loads on its own thread while the camera opens
+        hands.warm_up()
+        
+        if camera is not None and (replay is not None or 'source' in data):
+            camera.release()
+            camera = replay = None
+        
         if camera is None:
-            logger.debug('Attempting to initialize camera with index 0')
-            camera = cv2.VideoCapture(0)
-            camera.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
-            camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+            source = data.get('source', VIDEO_SOURCE)
+            logger.debug(f'Attempting to open video source {source}')
+            camera = open_source(source, width=CAMERA_WIDTH, height=CAMERA_HEIGHT,
+                                 loop=bool(data.get('loop', False)))
         
         if not camera.isOpened():
+            camera.release()
+            camera = None
             logger.error('Camera initialization failed')
             return jsonify({
                 'error': 'Cannot open camera',
-                'details': 'Check if camera is connected or try a different index (e.g., 1, 2)'
+                'details': 'Check if camera is connected or try a different source (e.g., 1, 2, a video file or "synthetic")'
             }), 500
         
         ret, frame = camera.read()
@@ -301,13 +623,17 @@ def start_camera():
                 'details': 'Ensure camera is functional and not in use by another application'
             }), 500
         
+        if not hands.wait(MODEL_READY_TIMEOUT):
+            logger.warning(f'Hands model not ready ({hands.state}), first frames will wait for it')
+        
         camera_active = True
-        canvas = None
+        state_store.submit(reset_session)
         logger.info('Camera started successfully')
         
         return jsonify({
             'status': 'Camera started successfully',
-            'active': True
+            'active': True,
+            'model': hands.state
         })
     
     except Exception as e:
@@ -320,7 +646,7 @@ def start_camera():
 @app.route('/api/stop_camera', methods=['POST'])
 def stop_camera():
     """Stop the camera"""
-    global camera, camera_active, streaming_active
+    global camera, camera_active, streaming_active, replay
     
     try:
         camera_active = False
@@ -328,6 +654,7 @@ def stop_camera():
         if camera is not None:
             camera.release()
             camera = None
+            replay = None
             logger.info('Camera stopped and released')
         
         return jsonify({
@@ -346,13 +673,43 @@ def stop_camera():
 def get_state():
     """Get current drawing state"""
     logger.debug('Fetching drawing state')
+    version, state = state_store.snapshot()
     return jsonify({
         'camera_active': camera_active,
-        'gesture': drawing_state['gesture'],
-        'color': drawing_state['color'],
-        'color_index': drawing_state['color_index'],
-        'brush_size': drawing_state['brush_size'],
-        'drawing': drawing_state['drawing']
+        'version': version,
+        'gesture': state['gesture'],
+        'color': state['color'],
+        'color_index': state['color_index'],
+        'brush_size': state['brush_size'],
+        'drawing': state['drawing'],
+        'hands': state['hands'],
+        'stream': stream_scheduler.metrics()
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Get stream timing metrics"""
+    return jsonify({
+        'streaming_active': streaming_active,
+        **stream_scheduler.metrics(),
+        **stream_rate.metrics()
+    })
+
+@app.route('/api/set_fps', methods=['POST'])
+def set_fps():
+    """Set the target stream FPS"""
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        stream_rate.set_max_fps(float(data.get('fps')))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid FPS requested: {data.get('fps')}")
+        return jsonify({'error': 'Invalid fps'}), 400
+    
+    logger.info(f"Stream target FPS set to {stream_scheduler.target_fps}")
+    return jsonify({
+        'status': 'FPS updated',
+        'fps': stream_scheduler.target_fps
     })
 
 @app.route('/api/set_color', methods=['POST'])
@@ -363,8 +720,7 @@ def set_color():
     
     if color_name in color_names:
         color_index = color_names.index(color_name)
-        drawing_state['color_index'] = color_index
-        drawing_state['color'] = color_name
+        state_store.submit(apply_color, color_index)
         logger.info(f'Color set to {color_name}')
         
         return jsonify({
@@ -379,19 +735,64 @@ def set_color():
 @app.route('/api/clear_canvas', methods=['POST'])
 def clear_canvas():
     """Clear the drawing canvas"""
-    global canvas
-    
-    if camera_active and camera is not None:
-        ret, frame = camera.read()
-        if ret:
-            frame = cv2.resize(frame, (CAMERA_WIDTH, CAMERA_HEIGHT))
-            frame = cv2.flip(frame, 1)
-            h, w = frame.shape[:2]
-            canvas = np.ones((h, w, 3), dtype=np.uint8) * 255
-            logger.info('Canvas cleared')
+    state_store.submit(reset_canvas)
+    logger.info('Canvas cleared')
     
     return jsonify({'status': 'Canvas cleared'})
 
+@app.route('/api/start_recording', methods=['POST'])
+def start_recording():
+    """Start recording the landmarks produced for each frame"""
+    global recorder
+    
+    with state_store.frame_lock:  # Not while a frame is adding to it
+        if recorder is not None:
+            return jsonify({'error': 'Recording already in progress'}), 400
+        recorder = LandmarkRecorder((CAMERA_WIDTH, CAMERA_HEIGHT))
+    logger.info('Landmark recording started')
+    return jsonify({'status': 'Recording started'})
+
+@app.route('/api/stop_recording', methods=['POST'])
+def stop_recording():
+    """Stop recording and save the landmarks to a .npz file in RECORDINGS_DIR"""
+    global recorder
+    
+    data = request.get_json(silent=True) or {}
+    path = recording_path(data.get('path') or f'session_{int(time.time())}.npz')
+    if path is None:
+        return jsonify({'error': 'Invalid recording name', 'details': 'Give a file name without directories'}), 400
+    
+    # Taken under frame_lock so no frame is half-way through adding to it
+    with state_store.frame_lock:
+        finished, recorder = recorder, None
+    if finished is None:
+        return jsonify({'error': 'No recording in progress'}), 400
+    
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    try:
+        finished.save(path)
+    except Exception as e:
+        logger.error(f'Recording save error: {str(e)}')
+        return jsonify({
+            'error': 'Failed to save recording',
+            'details': str(e)
+        }), 500
+    
+    logger.info(f'Saved {len(finished)} frames to {path}')
+    return jsonify({
+        'status': 'Recording saved',
+        'name': os.path.basename(path),  # What start_camera takes as 'replay'
+        'frames': len(finished)
+    })
+
+@app.route('/api/detect_landmarks', methods=['POST'])
+def detect_landmarks_route():
+    """Browser capture mode over HTTP: JPEG body in, landmarks out"""
+    response = landmarks_response({'frame': request.get_data()})
+    if 'error' in response:
+        return jsonify(response), 400
+    return jsonify(response)
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -399,7 +800,12 @@ def health_check():
     return jsonify({
         'status': 'OK',
         'timestamp': time.time(),
-        'camera_active': camera_active
+        'camera_active': camera_active,
+        'ready': hands.ready,
+        'models': {
+            'hands': hands.status(),
+            'browser_hands': browser_hands.status()
+        }
     })
 
 if __name__ == '__main__':
@@ -410,7 +816,15 @@ if __name__ == '__main__':
     logger.info("- GET /api/get_state - Get drawing state")
     logger.info("- POST /api/set_color - Set drawing color")
     logger.info("- POST /api/clear_canvas - Clear canvas")
+    logger.info("- POST /api/set_fps - Set target stream FPS")
+    logger.info("- GET /api/metrics - Stream timing metrics")
+    logger.info("- POST /api/start_recording - Start recording landmarks")
+    logger.info("- POST /api/stop_recording - Save landmark recording")
     logger.info("- GET /api/health - Health check")
-    logger.info("- WebSocket events: connect, disconnect, start_stream, stop_stream")
+    logger.info("- POST /api/detect_landmarks - Landmarks for a JPEG frame (browser capture)")
+    logger.info("- WebSocket events: connect, disconnect, start_stream ({fps}), stop_stream, process_frame, client_stats")
     
+    # debug=True runs this module again in a reloader child, which is the one serving
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warm_up_models()
     socketio.run(app, debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""Drawing state shared between the frame loop and the request handlers.
+
+The frame loop owns the mutable state (drawing_state, the canvas, the hand
+tracker). Handlers never write it directly: they submit commands, which run
+on whichever thread holds the frame lock, between two frames. Readers get
+the last published snapshot, an immutable copy swapped in with a single
+reference assignment, so reading never takes a lock.
+
+    def process_frame():
+        with store.frame_lock:
+            store.run_pending()
+            ...update the state...
+            store.publish()
+
+    store.submit(clear_canvas)         # from a request handler
+    version, state = store.snapshot()
+"""
+import queue
+import threading
+from types import MappingProxyType
+
+
+class StateStore:
+    """Versioned snapshots of a state dict plus a queue of pending mutations"""
+
+    def __init__(self, state):
+        self.state = state  # Only touched while holding frame_lock
+        self.frame_lock = threading.Lock()
+        self.commands = queue.SimpleQueue()
+        self.version = 0
+        self._snapshot = (0, MappingProxyType(dict(state)))
+
+    def snapshot(self):
+        """(version, read-only copy of the state) as of the last publish"""
+        return self._snapshot
+
+    def publish(self):
+        """Make the current state visible to readers; call with frame_lock held"""
+        self.version += 1
+        self._snapshot = (self.version, MappingProxyType(dict(self.state)))
+
+    def submit(self, command, *args):
+        """Queue command(*args) to run between frames.
+
+        If no frame is being processed right now (e.g. the camera is off) the
+        command runs immediately on the calling thread; otherwise the frame
+        loop runs it before its next frame. Never waits for a frame.
+        """
+        self.commands.put((command, args))
+        if self.frame_lock.acquire(blocking=False):
+            try:
+                if self.run_pending():
+                    self.publish()
+            finally:
+                self.frame_lock.release()
+
+    def run_pending(self):
+        """Run queued commands in order; call with frame_lock held. Returns how many ran"""
+        count = 0
+        while True:
+            try:
+                command, args = self.commands.get_nowait()
+            except queue.Empty:
+                return count
+            command(*args)
+            count += 1
@@ -0,0 +1,285 @@
+/*
+ * Browser capture mode for the GestureDraw front ends.
+ *
+ * The browser owns the camera, the drawing and all stroke state. Each frame is
+ * mirrored, downscaled and sent to the backend as a JPEG over Socket.IO
+ * ('process_frame'); the backend answers with the landmarks, raised fingers,
+ * gesture and that gesture's settings from gestures.json (eraser size, size
+ * limits, cooldown) of every hand ('landmarks') and keeps nothing between
+ * frames. Only one frame is in flight at a time, so a slow server lowers the
+ * detection rate instead of building up a queue.
+ *
+ * Served by the backend at /static/browser_capture.js and used as a plain
+ * script by the React app and the Streamlit component:
+ *
+ *   const capture = new BrowserCapture({ socket, canvas, onState });
+ *   await capture.start();
+ */
+(function (global) {
+  const COLORS = [
+    { name: 'Red', value: '#ff0000' },
+    { name: 'Green', value: '#00ff00' },
+    { name: 'Blue', value: '#0000ff' },
+    { name: 'Black', value: '#000000' },
+    { name: 'Yellow', value: '#ffff00' },
+    { name: 'Orange', value: '#ffa500' },
+  ];
+  const UNDO_DEPTH = 10; // Drawing snapshots kept for the undo gesture, as on the server
+  const RESPONSE_TIMEOUT = 1000; // ms before a lost frame is given up on
+
+  class BrowserCapture {
+    constructor({ socket, canvas, onState = () => {}, sendWidth = 320, jpegQuality = 0.7 }) {
+      this.socket = socket;
+      this.canvas = canvas;
+      this.ctx = canvas.getContext('2d');
+      this.onState = onState;
+      this.sendWidth = sendWidth;
+      this.jpegQuality = jpegQuality;
+
+      this.video = document.createElement('video');
+      this.video.muted = true;
+      this.video.playsInline = true;
+      this.sendCanvas = document.createElement('canvas');
+      this.drawLayer = document.createElement('canvas');
+      this.drawLayer.width = canvas.width;
+      this.drawLayer.height = canvas.height;
+      this.drawCtx = this.drawLayer.getContext('2d');
+
+      this.colorIndex = 0;
+      this.brushSize = 5;
+      this.lastColorChange = 0;
+      this.undoHistory = []; // Drawing layer snapshots, newest last
+      this.handStates = {}; // Stroke state per handedness label
+      this.hands = [];
+      this.frameId = 0;
+      this.sentAt = 0;
+      this.inFlight = false;
+      this.running = false;
+      this.handleLandmarks = this.handleLandmarks.bind(this);
+    }
+
+    async start() {
+      this.stream = await navigator.mediaDevices.getUserMedia({
+        video: { width: this.canvas.width, height: this.canvas.height },
+        audio: false,
+      });
+      this.video.srcObject = this.stream;
+      await this.video.play();
+
+      const scale = this.sendWidth / (this.video.videoWidth || this.canvas.width);
+      this.sendCanvas.width = this.sendWidth;
+      this.sendCanvas.height = Math.round((this.video.videoHeight || this.canvas.height) * scale);
+
+      this.socket.on('landmarks', this.handleLandmarks);
+      this.running = true;
+      this.emitState('Ready', false);
+      this.loop();
+    }
+
+    stop() {
+      this.running = false;
+      this.inFlight = false;
+      this.socket.off('landmarks', this.handleLandmarks);
+      if (this.stream) {
+        this.stream.getTracks().forEach((track) => track.stop());
+        this.stream = null;
+      }
+      this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
+    }
+
+    clear() {
+      this.pushUndo();
+      this.drawCtx.clearRect(0, 0, this.drawLayer.width, this.drawLayer.height);
+    }
+
+    pushUndo() {
+      this.undoHistory.push(this.drawCtx.getImageData(0, 0, this.drawLayer.width, this.drawLayer.height));
+      if (this.undoHistory.length > UNDO_DEPTH) this.undoHistory.shift();
+    }
+
+    setColor(name) {
+      const index = COLORS.findIndex((color) => color.name === name);
+      if (index >= 0) {
+        this.colorIndex = index;
+        this.emitState('Ready', false);
+      }
+    }
+
+    loop() {
+      if (!this.running) return;
+      this.sendFrame();
+      this.render();
+      requestAnimationFrame(() => this.loop());
+    }
+
+    sendFrame() {
+      const now = performance.now();
+      if (this.inFlight && now - this.sentAt < RESPONSE_TIMEOUT) return;
+      if (this.video.readyState < 2) return;
+
+      const ctx = this.sendCanvas.getContext('2d');
+      ctx.save();
+      ctx.scale(-1, 1);
+      ctx.drawImage(this.video, -this.sendCanvas.width, 0, this.sendCanvas.width, this.sendCanvas.height);
+      ctx.restore();
+
+      const id = ++this.frameId;
+      this.inFlight = true;
+      this.sentAt = now;
+      this.sendCanvas.toBlob(async (blob) => {
+        if (!blob || !this.running) {
+          this.inFlight = false;
+          return;
+        }
+        this.socket.emit('process_frame', { id, frame: await blob.arrayBuffer() });
+      }, 'image/jpeg', this.jpegQuality);
+    }
+
+    toCanvas(point) {
+      return [Math.round(point[0] * this.canvas.width), Math.round(point[1] * this.canvas.height)];
+    }
+
+    selectColor(x, y) {
+      if (y >= 20 && y <= 70) {
+        for (let i = 0; i < COLORS.length; i++) {
+          const colorX = 20 + i * 60;
+          if (x >= colorX && x <= colorX + 50) return i;
+        }
+      }
+      return null;
+    }
+
+    handleLandmarks(data) {
+      if (data.id !== this.frameId) return; // Reply to a frame we gave up on
+      this.inFlight = false;
+
+      const seen = new Set();
+      const gestures = [];
+      let anyDrawing = false;
+
+      data.hands.forEach((hand) => {
+        const state = this.handStates[hand.hand]
+          || (this.handStates[hand.hand] = { drawing: false, prevX: 0, prevY: 0, action: null, lastUndo: 0 });
+        const { params } = hand;
+        seen.add(hand.hand);
+        const [x, y] = this.toCanvas(hand.landmarks[8]);
+        const [thumbX, thumbY] = this.toCanvas(hand.landmarks[4]);
+        let gesture = 'Ready';
+        let drawing = false;
+
+        if (hand.gesture === 'draw') {
+          gesture = 'Drawing';
+          const selected = this.selectColor(x, y);
+          if (selected !== null) {
+            this.colorIndex = selected;
+            gesture = `Color: ${COLORS[selected].name}`;
+          } else {
+            if (state.drawing) {
+              this.drawCtx.globalCompositeOperation = 'source-over';
+              this.drawCtx.strokeStyle = COLORS[this.colorIndex].value;
+              this.drawCtx.lineWidth = this.brushSize;
+              this.drawCtx.lineCap = 'round';
+              this.drawCtx.beginPath();
+              this.drawCtx.moveTo(state.prevX, state.prevY);
+              this.drawCtx.lineTo(x, y);
+              this.drawCtx.stroke();
+            } else {
+              this.pushUndo();
+            }
+            state.prevX = x;
+            state.prevY = y;
+            drawing = true;
+          }
+        } else if (hand.gesture === 'hover') {
+          gesture = 'Hover';
+        } else if (hand.gesture === 'erase') {
+          gesture = 'Erasing';
+          if (state.action !== 'erase') this.pushUndo();
+          this.drawCtx.globalCompositeOperation = 'destination-out';
+          this.drawCtx.beginPath();
+          this.drawCtx.arc(x, y, params.size, 0, 2 * Math.PI);
+          this.drawCtx.fill();
+          this.drawCtx.globalCompositeOperation = 'source-over';
+        } else if (hand.gesture === 'resize') {
+          gesture = 'Adjusting Size';
+          const pinch = Math.hypot(thumbX - x, thumbY - y);
+          this.brushSize = Math.max(params.min, Math.min(params.max, Math.floor(pinch / params.divisor)));
+        } else if (hand.gesture === 'next_color') {
+          const now = performance.now();
+          if (now - this.lastColorChange > params.cooldown * 1000) {
+            this.colorIndex = (this.colorIndex + 1) % COLORS.length;
+            this.lastColorChange = now;
+            gesture = `Next Color: ${COLORS[this.colorIndex].name}`;
+          }
+        } else if (hand.gesture === 'undo') {
+          const now = performance.now();
+          if (now - state.lastUndo > params.cooldown * 1000 && this.undoHistory.length) {
+            this.drawCtx.putImageData(this.undoHistory.pop(), 0, 0);
+            state.lastUndo = now;
+            gesture = 'Undo';
+          }
+        }
+
+        state.drawing = drawing;
+        state.action = hand.gesture;
+        anyDrawing = anyDrawing || drawing;
+        gestures.push(gesture);
+      });
+
+      Object.keys(this.handStates).forEach((label) => {
+        if (!seen.has(label)) Object.assign(this.handStates[label], { drawing: false, action: null });
+      });
+      this.hands = data.hands;
+      this.emitState(gestures.join(' | ') || 'Ready', anyDrawing);
+    }
+
+    emitState(gesture, drawing) {
+      this.onState({
+        gesture,
+        color: COLORS[this.colorIndex].name,
+        brush_size: this.brushSize,
+        drawing,
+      });
+    }
+
+    render() {
+      const { ctx, canvas } = this;
+      const color = COLORS[this.colorIndex].value;
+
+      ctx.save();
+      ctx.scale(-1, 1);
+      ctx.drawImage(this.video, -canvas.width, 0, canvas.width, canvas.height);
+      ctx.restore();
+      ctx.drawImage(this.drawLayer, 0, 0);
+
+      this.hands.forEach((hand) => {
+        ctx.fillStyle = '#ffffff';
+        hand.landmarks.forEach((point) => {
+          const [px, py] = this.toCanvas(point);
+          ctx.fillRect(px - 2, py - 2, 4, 4);
+        });
+        const [x, y] = this.toCanvas(hand.landmarks[8]);
+        ctx.beginPath();
+        ctx.arc(x, y, hand.gesture === 'erase' ? hand.params.size : this.brushSize, 0, 2 * Math.PI);
+        ctx.strokeStyle = hand.gesture === 'erase' ? '#ffff00' : color;
+        ctx.lineWidth = 2;
+        ctx.stroke();
+      });
+
+      COLORS.forEach((entry, i) => {
+        const x = 20 + i * 60;
+        ctx.fillStyle = entry.value;
+        ctx.fillRect(x, 20, 50, 50);
+        ctx.strokeStyle = i === this.colorIndex ? '#ffffff' : '#000000';
+        ctx.lineWidth = i === this.colorIndex ? 3 : 1;
+        ctx.strokeRect(x, 20, 50, 50);
+      });
+
+      ctx.fillStyle = color;
+      ctx.font = 'bold 18px sans-serif';
+      ctx.fillText(`${COLORS[this.colorIndex].name} | Size: ${this.brushSize}`, canvas.width - 250, 35);
+    }
+  }
+
+  global.BrowserCapture = BrowserCapture;
+})(window);
@@ -0,0 +1,123 @@
+"""Memory churn of the backend frame pipeline with and without buffer pooling.
+
+Replays a synthetic recording through process_frame and encode_frame_update
+with FrameBuffers pooling on and off, and reports per frame:
+
+- ms: mean time per frame
+- faults: minor page faults; every freshly allocated frame-sized array is
+  ~225 faults when first written, so this counts buffers that were not reused
+- peak MB: tracemalloc peak above the start of the frame, i.e. the
+  short-lived arrays alive at once while the frame is built
+- gc/1k: garbage collections per 1000 frames (all generations)
+- gc ms: total time spent in garbage collection
+
+Python's collector is triggered by container objects, not array memory, so
+pooling shows up in faults and peak MB rather than in the gc columns.
+
+    python benchmarks/frame_allocations.py --frames 600 --hands 2
+"""
+import argparse
+import gc
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+from synthetic_hands import write_recording
+from frame_buffers import FrameBuffers
+
+
+class GCTimer:
+    """Counts collections and their total duration through gc.callbacks"""
+
+    def __init__(self):
+        self.collections = 0
+        self.seconds = 0.0
+        self.started = None
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self.started = time.perf_counter()
+        elif self.started is not None:
+            self.collections += 1
+            self.seconds += time.perf_counter() - self.started
+            self.started = None
+
+
+def run_frames(main, path, frames, encode, traced):
+    """Replay `frames` frames; returns (seconds, faults, peak bytes per frame)"""
+    client = main.app.test_client()
+    client.post('/api/start_camera', json={'replay': path, 'speed': 0, 'loop': True})
+    main.process_frame()  # Canvas and buffers are allocated on the first frame
+
+    peak = 0
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+    start = time.perf_counter()
+    for _ in range(frames):
+        if traced:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        result_frame, _ = main.process_frame()
+        if encode:
+            main.encode_frame_update(result_frame)
+        if traced:
+            peak += tracemalloc.get_traced_memory()[1] - before
+    elapsed = time.perf_counter() - start
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt - faults
+    client.post('/api/stop_camera')
+    return elapsed, faults, peak / frames
+
+
+def measure(main, path, pooled, frames, encode):
+    main.frame_buffers = FrameBuffers(pooled=pooled)
+
+    gc_timer = GCTimer()
+    gc.collect()
+    gc.callbacks.append(gc_timer)
+    try:
+        elapsed, faults, _ = run_frames(main, path, frames, encode, traced=False)
+    finally:
+        gc.callbacks.remove(gc_timer)
+
+    # tracemalloc slows everything down, so peaks come from a separate pass
+    tracemalloc.start()
+    try:
+        _, _, peak = run_frames(main, path, min(frames, 200), encode, traced=True)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'ms': 1000 * elapsed / frames,
+        'faults': faults / frames,
+        'peak_mb': peak / 1e6,
+        'gc_per_1k': 1000 * gc_timer.collections / frames,
+        'gc_ms': 1000 * gc_timer.seconds,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--hands', type=int, default=1, help='hands in the synthetic recording')
+    parser.add_argument('--no-encode', action='store_true', help='leave JPEG encoding out')
+    args = parser.parse_args()
+
+    import main
+    main.logger.setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main.RECORDINGS_DIR = tmp  # start_camera replays names from there
+        path = os.path.basename(write_recording(os.path.join(tmp, 'hands.npz'), args.hands, 600))
+        run_frames(main, path, 100, True, traced=False)  # Warm up imports and caches
+        print(f"{'buffers':>8}{'ms':>8}{'faults':>9}{'peak MB':>9}{'gc/1k':>8}{'gc ms':>8}")
+        for pooled in (False, True):
+            row = measure(main, path, pooled, args.frames, not args.no_encode)
+            print(f"{'pooled' if pooled else 'fresh':>8}{row['ms']:>8.2f}{row['faults']:>9.1f}"
+                  f"{row['peak_mb']:>9.2f}{row['gc_per_1k']:>8.1f}{row['gc_ms']:>8.1f}")
+        print(f"pool size: {main.frame_buffers.nbytes() / 1e6:.2f} MB")
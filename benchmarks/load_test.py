@@ -0,0 +1,231 @@
+"""Load-test the backend with many simulated Socket.IO clients.
+
+Connects N clients to one server and starts the stream. During the run,
+random clients restart the stream (stop_stream, then start_stream) and call
+set_color and clear_canvas, each at its own rate per second across all
+clients. The report covers:
+
+- fps: frames per second each client received (mean and the worst client)
+- latency: receive time minus the capture timestamp in each frame_update
+  (p50/p95/max); this needs the server on the same clock, i.e. this host
+- restart gap: start_stream until the first frame captured after it
+- set_color/clear_canvas: HTTP round trip (p50/p95) and failed calls
+- cpu %/rss MB: server process usage, sampled twice a second
+
+The server is started here, fed by the synthetic source, a video file
+(--source) or a landmark recording from its recordings/ directory (--replay).
+To test a server that is already running, pass --url, plus --pid to sample
+its CPU and memory.
+
+    python benchmarks/load_test.py --clients 25 --duration 30 --source demo.mp4 --color-rate 2 --clear-rate 0.2
+    python benchmarks/load_test.py --url http://localhost:5000 --pid 4242 --restart-rate 0.1 --report load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import psutil
+import socketio
+
+from server_capacity import SERVERS, api, start_server, stop_server
+
+COLOR_NAMES = ["Red", "Green", "Blue", "Black", "Yellow", "Orange"]
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+class LoadStats:
+    """Everything the clients and action loops observe during one run"""
+
+    def __init__(self, clients):
+        self.frames = [0] * clients
+        self.latencies = []
+        self.restart_gaps = []
+        self.restart_started = None
+        self.calls = {name: {'ms': [], 'errors': 0} for name in ('set_color', 'clear_canvas')}
+        self.cpu = []
+        self.rss = []
+
+    def reset(self):
+        self.__init__(len(self.frames))
+
+    def on_frame(self, client, data):
+        now = time.time()
+        self.frames[client] += 1
+        if data.get('timestamp'):
+            self.latencies.append(1000 * (now - data['timestamp']))
+        # Frames captured before the restart were still in flight from the old stream
+        if self.restart_started is not None and data.get('timestamp', now) >= self.restart_started:
+            self.restart_gaps.append(1000 * (now - self.restart_started))
+            self.restart_started = None
+
+
+def source_spec(source):
+    """The video source as the server should open it.
+
+    The server runs in backend/, so a relative file or folder path is made
+    absolute here; webcam indexes, 'synthetic' and tcp:// pass through.
+    """
+    return os.path.abspath(source) if os.path.exists(source) else source
+
+
+async def poisson(rate, action):
+    """Run `action` at random intervals averaging `rate` per second"""
+    if rate <= 0:
+        return
+    while True:
+        await asyncio.sleep(random.expovariate(rate))
+        await action()
+
+
+async def sample_usage(pid, stats):
+    proc = psutil.Process(pid)
+    proc.cpu_percent()  # First call only sets the baseline
+    while True:
+        await asyncio.sleep(0.5)
+        stats.cpu.append(proc.cpu_percent())
+        stats.rss.append(proc.memory_info().rss)
+
+
+async def run_load(url, args, pid=None):
+    loop = asyncio.get_running_loop()
+    stats = LoadStats(args.clients)
+    sockets = []
+    for i in range(args.clients):
+        sio = socketio.AsyncClient(reconnection=False)
+        sio.on('frame_update', lambda data, i=i: stats.on_frame(i, data))
+        await sio.connect(url, transports=['websocket'])
+        sockets.append(sio)
+
+    async def call(name, payload=None):
+        start = time.perf_counter()
+        try:
+            await loop.run_in_executor(None, api, f'{url}/api/{name}', 'POST', payload)
+        except OSError:
+            stats.calls[name]['errors'] += 1
+            return
+        stats.calls[name]['ms'].append(1000 * (time.perf_counter() - start))
+
+    async def restart_stream():
+        sio = random.choice(sockets)
+        await sio.emit('stop_stream')
+        await asyncio.sleep(args.restart_gap)  # Lets the old stream loop notice before restarting
+        stats.restart_started = time.time()
+        await sio.emit('start_stream', {'fps': args.fps})
+
+    camera = {'replay': args.replay} if args.replay else {'source': source_spec(args.source)}
+    await loop.run_in_executor(None, api, f'{url}/api/start_camera', 'POST', dict(camera, loop=True))
+    await sockets[0].emit('start_stream', {'fps': args.fps})
+    await asyncio.sleep(args.warmup)
+    stats.reset()
+
+    tasks = [
+        poisson(args.restart_rate, restart_stream),
+        poisson(args.color_rate, lambda: call('set_color', {'color': random.choice(COLOR_NAMES)})),
+        poisson(args.clear_rate, lambda: call('clear_canvas')),
+    ]
+    if pid is not None:
+        tasks.append(sample_usage(pid, stats))
+    tasks = [asyncio.create_task(task) for task in tasks]
+    await asyncio.sleep(args.duration)
+    frames = list(stats.frames)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    metrics = await loop.run_in_executor(None, api, f'{url}/api/metrics')
+
+    await sockets[0].emit('stop_stream')
+    await loop.run_in_executor(None, api, f'{url}/api/stop_camera', 'POST')
+    for sio in sockets:
+        await sio.disconnect()
+
+    fps = [count / args.duration for count in frames]
+    return {
+        'clients': args.clients,
+        'duration': args.duration,
+        'mean_fps': sum(fps) / len(fps),
+        'min_fps': min(fps),
+        'server_target_fps': metrics.get('target_fps'),
+        'server_effective_fps': metrics.get('effective_fps'),
+        'latency_ms': {
+            'p50': percentile(stats.latencies, 50),
+            'p95': percentile(stats.latencies, 95),
+            'max': max(stats.latencies, default=0.0),
+        },
+        'restarts': len(stats.restart_gaps),
+        'restart_gap_ms': percentile(stats.restart_gaps, 50),
+        'calls': {
+            name: {
+                'count': len(call_stats['ms']),
+                'errors': call_stats['errors'],
+                'p50_ms': percentile(call_stats['ms'], 50),
+                'p95_ms': percentile(call_stats['ms'], 95),
+            }
+            for name, call_stats in stats.calls.items()
+        },
+        'cpu_percent': {
+            'mean': sum(stats.cpu) / len(stats.cpu) if stats.cpu else None,
+            'max': max(stats.cpu, default=None),
+        },
+        'rss_mb': max(stats.rss) / 1e6 if stats.rss else None,
+    }
+
+
+def print_report(report):
+    latency = report['latency_ms']
+    print(f"clients {report['clients']}, {report['duration']:.0f}s, server target "
+          f"{report['server_target_fps']} fps, effective {report['server_effective_fps']} fps")
+    print(f"  fps          mean {report['mean_fps']:.1f}  worst client {report['min_fps']:.1f}")
+    print(f"  latency ms   p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  max {latency['max']:.1f}")
+    if report['restarts']:
+        print(f"  restarts     {report['restarts']}  gap p50 {report['restart_gap_ms']:.0f} ms")
+    for name, call in report['calls'].items():
+        if call['count'] or call['errors']:
+            print(f"  {name:<13}{call['count']} ok, {call['errors']} failed  "
+                  f"p50 {call['p50_ms']:.1f} ms  p95 {call['p95_ms']:.1f} ms")
+    if report['rss_mb'] is not None:
+        cpu = report['cpu_percent']
+        print(f"  server       cpu mean {cpu['mean']:.0f}%  max {cpu['max']:.0f}%  rss {report['rss_mb']:.0f} MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server', choices=sorted(SERVERS), default='flask', help='server to start')
+    parser.add_argument('--url', help='test a running server instead of starting one')
+    parser.add_argument('--pid', type=int, help='process to sample CPU/memory of with --url')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--source', default='synthetic', help='video source for the server (e.g. a video file)')
+    parser.add_argument('--replay', help="name of a landmark recording in the server's recordings/ directory to replay")
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds measured')
+    parser.add_argument('--warmup', type=float, default=2.0, help='seconds streamed before measuring')
+    parser.add_argument('--fps', type=float, default=30.0, help='stream FPS requested by the clients')
+    parser.add_argument('--restart-rate', type=float, default=0.0, help='stream restarts per second')
+    parser.add_argument('--restart-gap', type=float, default=0.5, help='seconds between stop_stream and start_stream')
+    parser.add_argument('--color-rate', type=float, default=1.0, help='set_color calls per second')
+    parser.add_argument('--clear-rate', type=float, default=0.1, help='clear_canvas calls per second')
+    parser.add_argument('--report', help='also write the report as JSON to this file')
+    args = parser.parse_args()
+
+    if args.url:
+        report = asyncio.run(run_load(args.url.rstrip('/'), args, args.pid))
+    else:
+        process = start_server(args.server, args.port, source_spec(args.source))
+        try:
+            report = asyncio.run(run_load(f'http://localhost:{args.port}', args, process.pid))
+        finally:
+            stop_server(process)
+        report['server'] = args.server
+
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,91 @@
+"""Per-frame cost of tracking 1, 2 and 4 hands.
+
+Two parts are measured separately for each hand limit:
+
+- inference: hands.process with max_num_hands=N on frames from --source. Use
+  a clip with at least N hands in view (a webcam index works too); the
+  synthetic source has no hands and only measures the palm detector.
+- pipeline: backend process_frame (gesture logic, drawing, compositing)
+  replaying a synthetic recording with exactly N moving hands.
+
+    python benchmarks/multi_hand_cost.py --source two_people.mp4 --frames 300
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import mediapipe as mp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+from synthetic_hands import write_recording
+from video_sources import open_source
+
+
+def inference_cost(source, max_num_hands, frames):
+    """Mean ms per frame of hands.process, and mean hands found"""
+    hands = mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=max_num_hands,
+        min_detection_confidence=0.8,
+        min_tracking_confidence=0.7
+    )
+    capture = open_source(source, width=640, height=480, loop=True)
+    total = 0.0
+    found = 0
+    try:
+        for _ in range(frames):
+            ret, frame = capture.read()
+            if not ret:
+                break
+            rgb = cv2.cvtColor(cv2.flip(cv2.resize(frame, (640, 480)), 1), cv2.COLOR_BGR2RGB)
+            start = time.perf_counter()
+            results = hands.process(rgb)
+            total += time.perf_counter() - start
+            found += len(results.multi_hand_landmarks or [])
+    finally:
+        capture.release()
+        hands.close()
+    return 1000 * total / frames, found / frames
+
+
+def pipeline_cost(main, num_hands, frames):
+    """Mean ms per frame of process_frame replaying `num_hands` synthetic hands"""
+    from hand_tracking import HandTracker
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_recording(os.path.join(tmp, 'hands.npz'), num_hands, frames)
+        main.RECORDINGS_DIR = tmp  # start_camera replays names from there
+        main.hand_tracker = HandTracker(num_hands)
+        client = main.app.test_client()
+        client.post('/api/start_camera', json={'replay': 'hands.npz', 'speed': 0})
+        count = 0
+        start = time.perf_counter()
+        while main.process_frame()[0] is not None:
+            count += 1
+        elapsed = time.perf_counter() - start
+        client.post('/api/stop_camera')
+    return 1000 * elapsed / count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--source', default='synthetic', help='video source for the inference part')
+    parser.add_argument('--hands', default='1,2,4', help='comma-separated hand limits')
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    import main
+    main.logger.setLevel(logging.WARNING)
+
+    print(f"{'hands':>5}{'infer ms':>10}{'found':>7}{'pipeline ms':>13}{'total ms':>10}{'max fps':>9}")
+    for num_hands in [int(n) for n in args.hands.split(',')]:
+        infer_ms, found = inference_cost(args.source, num_hands, args.frames)
+        pipeline_ms = pipeline_cost(main, num_hands, args.frames)
+        total_ms = infer_ms + pipeline_ms
+        print(f"{num_hands:>5}{infer_ms:>10.2f}{found:>7.2f}{pipeline_ms:>13.2f}{total_ms:>10.2f}{1000 / total_ms:>9.1f}")
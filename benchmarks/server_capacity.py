@@ -0,0 +1,134 @@
+"""Compare how many concurrent Socket.IO viewers each backend server sustains.
+
+Starts backend/main.py (Flask-SocketIO, threads) and backend/async_server.py
+(ASGI, asyncio) in turn on the synthetic video source, connects N clients to
+the stream and reports the frame rate each client actually receives together
+with the server's CPU and memory use.
+
+    python benchmarks/server_capacity.py --clients 1,10,25,50 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+import psutil
+import socketio
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+# Run without the debug reloader so only the server itself is measured
+SERVERS = {
+    'flask': 'import main; main.socketio.run(main.app, host="127.0.0.1", port={port}, allow_unsafe_werkzeug=True)',
+    'async': 'import async_server, uvicorn; uvicorn.run(async_server.asgi_app, host="127.0.0.1", port={port})',
+}
+
+
+def api(url, method='GET', payload=None):
+    data = json.dumps(payload or {}).encode() if method == 'POST' else None
+    req = urllib.request.Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def start_server(name, port, source='synthetic'):
+    env = dict(os.environ, GESTURE_VIDEO_SOURCE=source, PYTHONUNBUFFERED='1')
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVERS[name].format(port=port)], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            api(f'http://localhost:{port}/api/health')
+            return process
+        except OSError:
+            time.sleep(0.5)
+    stop_server(process)
+    raise RuntimeError(f'{name} server did not come up on port {port}')
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def server_usage(process):
+    """CPU seconds and resident memory of the server process"""
+    proc = psutil.Process(process.pid)
+    cpu_times = proc.cpu_times()
+    return cpu_times.user + cpu_times.system, proc.memory_info().rss
+
+
+async def measure(url, clients, duration):
+    """Connect `clients` viewers and return the frame count each one received"""
+    counts = [0] * clients
+    sockets = []
+    for i in range(clients):
+        sio = socketio.AsyncClient(reconnection=False)
+
+        def on_frame(data, i=i):
+            counts[i] += 1
+
+        sio.on('frame_update', on_frame)
+        await sio.connect(url, transports=['websocket'])
+        sockets.append(sio)
+
+    await sockets[0].emit('start_stream')
+    await asyncio.sleep(2)  # Warm up
+    counts[:] = [0] * clients
+    await asyncio.sleep(duration)
+    received = list(counts)
+
+    await sockets[0].emit('stop_stream')
+    for sio in sockets:
+        await sio.disconnect()
+    return received
+
+
+def run(server, client_counts, duration, port):
+    process = start_server(server, port)
+    rows = []
+    try:
+        api(f'http://localhost:{port}/api/start_camera', 'POST')
+        for clients in client_counts:
+            cpu_before, _ = server_usage(process)
+            received = asyncio.run(measure(f'http://localhost:{port}', clients, duration))
+            cpu_after, rss = server_usage(process)
+            fps = [count / duration for count in received]
+            rows.append({
+                'server': server,
+                'clients': clients,
+                'mean_fps': sum(fps) / len(fps),
+                'min_fps': min(fps),
+                'cpu_percent': 100 * (cpu_after - cpu_before) / (duration + 2),
+                'rss_mb': rss / 1e6,
+            })
+            time.sleep(1)
+        api(f'http://localhost:{port}/api/stop_camera', 'POST')
+    finally:
+        stop_server(process)
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--servers', default='flask,async')
+    parser.add_argument('--clients', default='1,10,25,50', help='comma-separated client counts')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds measured per client count')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    client_counts = [int(n) for n in args.clients.split(',')]
+    print(f"{'server':<8}{'clients':>8}{'mean fps':>10}{'min fps':>10}{'cpu %':>8}{'rss MB':>9}")
+    for server in args.servers.split(','):
+        for row in run(server, client_counts, args.duration, args.port):
+            print(f"{row['server']:<8}{row['clients']:>8}{row['mean_fps']:>10.1f}{row['min_fps']:>10.1f}"
+                  f"{row['cpu_percent']:>8.0f}{row['rss_mb']:>9.0f}")
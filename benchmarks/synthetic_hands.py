@@ -0,0 +1,58 @@
+"""Synthetic landmark recordings for benchmarks.
+
+Builds LandmarkRecorder files in which each hand cycles through the draw,
+hover, erase, pinch and fist poses while moving in a circle, so the gesture
+and drawing code can be exercised without a camera or the Hands model.
+"""
+import math
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from recording import LandmarkRecorder
+
+# Thumb, index, middle, ring, pinky
+POSES = [
+    [0, 1, 0, 0, 0],  # Draw
+    [0, 1, 1, 0, 0],  # Hover
+    [1, 1, 1, 1, 1],  # Erase
+    [1, 1, 0, 0, 0],  # Pinch
+    [0, 0, 0, 0, 0],  # Fist
+]
+FRAMES_PER_POSE = 60
+
+
+def hand_pose(cx, cy, fingers, handedness="Right"):
+    """21 normalized landmarks around (cx, cy) that get_fingers_up reads as `fingers`"""
+    points = [[cx, cy + 0.1] for _ in range(21)]
+    thumb_out = -0.03 if handedness == "Right" else 0.03
+    points[3] = [cx, cy]
+    points[4] = [cx + (thumb_out if fingers[0] else -thumb_out), cy]
+    for finger, tip in enumerate([8, 12, 16, 20]):
+        x = cx + 0.01 * finger
+        points[tip - 2] = [x, cy]
+        points[tip] = [x, cy - 0.05 if fingers[finger + 1] else cy + 0.05]
+    points[0] = [cx, cy + 0.1]  # Wrist
+    return SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=0.0) for x, y in points])
+
+
+def write_recording(path, num_hands=1, frames=600, fps=30, frame_size=(640, 480)):
+    """Write a recording with `num_hands` hands spread across the frame"""
+    recorder = LandmarkRecorder(frame_size)
+    timestamp = 1000.0
+    for i in range(frames):
+        hand_landmarks = []
+        handedness = []
+        for hand in range(num_hands):
+            label = "Right" if hand % 2 == 0 else "Left"
+            fingers = POSES[(i // FRAMES_PER_POSE + hand) % len(POSES)]
+            centre_x = (hand + 0.5) / num_hands
+            cx = centre_x + 0.4 / num_hands * math.cos(i / 20 + hand)
+            cy = 0.5 + 0.2 * math.sin(i / 20 + hand)
+            hand_landmarks.append(hand_pose(cx, cy, fingers, label))
+            handedness.append(SimpleNamespace(classification=[SimpleNamespace(label=label)]))
+        recorder.add(timestamp, SimpleNamespace(multi_hand_landmarks=hand_landmarks, multi_handedness=handedness))
+        timestamp += 1.0 / fps
+    recorder.save(path)
+    return path
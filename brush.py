@@ -0,0 +1,98 @@
+"""Stroke rendering for the draw gesture.
+
+The draw gesture's "brush" entry in gestures.json picks how strokes are laid
+down:
+
+    {"type": "constant"}   cv2.line at the hand's brush size (the default)
+    {"type": "pressure"}   variable width: bringing the thumb tip towards
+                           the index tip presses harder and widens the line,
+                           moving fast thins it
+
+A stroke is a chain of samples (x, y, width, time). The pressure brush joins
+each new sample to the previous one with the convex hull of the two end
+discs - exactly the area a round nib covers while its width changes linearly
+between them - so one segment, body and round joins included, is a single
+cv2.fillConvexPoly call however the width varies.
+
+    brush = make_brushes(gestures)[gesture.name]                      # by draw gesture
+    sample = brush.start(point, thumb, size, now)                     # pen down
+    sample = brush.stroke(canvas, sample, point, thumb, size, now, color)
+"""
+import math
+
+import cv2
+import numpy as np
+
+SHIFT = 2  # Fractional bits of polygon coordinates, so widths change smoothly
+
+
+class ConstantBrush:
+    """Fixed-width strokes of the hand's brush size"""
+
+    def start(self, point, thumb, size, now):
+        return (point[0], point[1], size, now)
+
+    def stroke(self, canvas, last, point, thumb, size, now, color):
+        cv2.line(canvas, (last[0], last[1]), point, color, size)
+        return (point[0], point[1], size, now)
+
+
+class PressureBrush:
+    """Width from the thumb-index pinch and fingertip speed, relative to the brush size"""
+
+    def __init__(self, min_scale=0.4, max_scale=1.6, pinch_min=20, pinch_max=120,
+                 speed_max=1500.0, thinning=0.5, smoothing=0.5, sides=24):
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.pinch_min = pinch_min  # Pinch distance (px) of full pressure
+        self.pinch_max = pinch_max  # Pinch distance (px) of no pressure
+        self.speed_max = speed_max  # Speed (px/s) of full thinning
+        self.thinning = thinning
+        self.smoothing = smoothing  # Share of the previous width kept per sample
+        angles = np.linspace(0, 2 * np.pi, sides, endpoint=False)
+        self.disc = np.stack([np.cos(angles), np.sin(angles)], axis=1).astype(np.float32)
+
+    def width(self, size, point, thumb, speed):
+        pinch = math.dist(point, thumb)
+        pressure = (self.pinch_max - pinch) / (self.pinch_max - self.pinch_min)
+        pressure = min(1.0, max(0.0, pressure))
+        scale = self.min_scale + (self.max_scale - self.min_scale) * pressure
+        scale *= 1.0 - self.thinning * min(1.0, speed / self.speed_max)
+        return max(1.0, size * scale)
+
+    def start(self, point, thumb, size, now):
+        return (point[0], point[1], self.width(size, point, thumb, 0.0), now)
+
+    def stroke(self, canvas, last, point, thumb, size, now, color):
+        x, y, width, then = last
+        elapsed = now - then
+        speed = math.dist((x, y), point) / elapsed if elapsed > 0 else 0.0
+        target = self.width(size, point, thumb, speed)
+        new_width = width + (1.0 - self.smoothing) * (target - width)  # Damps landmark jitter
+        cv2.fillConvexPoly(canvas, self.segment((x, y), width, point, new_width), color, shift=SHIFT)
+        return (point[0], point[1], new_width, now)
+
+    def segment(self, start, start_width, end, end_width):
+        """Fixed-point polygon covering a round nib moved from start to end"""
+        discs = np.concatenate((
+            self.disc * (start_width / 2) + np.float32(start),
+            self.disc * (end_width / 2) + np.float32(end),
+        ))
+        return np.round(cv2.convexHull(discs) * (1 << SHIFT)).astype(np.int32)
+
+
+BRUSHES = {'constant': ConstantBrush, 'pressure': PressureBrush}
+
+
+def make_brush(config=None):
+    """Brush for a draw gesture's "brush" config; constant when there is none"""
+    config = dict(config or {})
+    kind = config.pop('type', 'constant')
+    if kind not in BRUSHES:
+        raise ValueError(f"Unknown brush type {kind!r}")
+    return BRUSHES[kind](**config)
+
+
+def make_brushes(gestures):
+    """Brush of each draw gesture, by gesture name"""
+    return {g.name: make_brush(g.params.get('brush')) for g in gestures if g.action == 'draw'}
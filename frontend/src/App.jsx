@@ -1,14 +1,37 @@
-import React, { useState, useEffect, useRef } from 'react';
+import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { Camera, Hand, Palette, ArrowRight, RotateCcw, AlertCircle, Sparkles } from 'lucide-react';
 import io from 'socket.io-client';
 
-const API_BASE = 'http://localhost:5000/api';
-const socket = io('http://localhost:5000', {
+const SERVER_URL = 'http://localhost:5000';
+const API_BASE = `${SERVER_URL}/api`;
+const socket = io(SERVER_URL, {
   reconnectionAttempts: 5,
   timeout: 10000,
   transports: ['websocket']
 });
 
+// Browser capture mode: the camera is opened here and the server only returns
+// landmarks. The capture/drawing code is shared with the Streamlit app and
+// served by the backend.
+const loadBrowserCapture = () => new Promise((resolve, reject) => {
+  if (window.BrowserCapture) {
+    resolve(window.BrowserCapture);
+    return;
+  }
+  const script = document.createElement('script');
+  script.src = `${SERVER_URL}/static/browser_capture.js`;
+  script.onload = () => resolve(window.BrowserCapture);
+  script.onerror = () => reject(new Error('Failed to load browser capture script'));
+  document.head.appendChild(script);
+});
+
+// Server mode frames are decoded and drawn by frameRenderer.worker.js on an
+// OffscreenCanvas; older browsers fall back to drawing on the main thread.
+const WORKER_RENDERING = typeof Worker !== 'undefined'
+  && typeof OffscreenCanvas !== 'undefined'
+  && typeof createImageBitmap !== 'undefined'
+  && 'transferControlToOffscreen' in HTMLCanvasElement.prototype;
+
 const LandingPage = () => {
   const [showMainApp, setShowMainApp] = useState(false);
 
@@ -172,9 +195,61 @@ const MainDrawingApp = ({ onBack }) => {
   });
   const [error, setError] = useState('');
   const [loading, setLoading] = useState(false);
+  const [captureMode, setCaptureMode] = useState('server');
   const canvasRef = useRef(null);
+  const browserCapture = useRef(null);
   const frameQueue = useRef([]);
   const lastUpdate = useRef(0);
+  const renderWorker = useRef(null);
+  const offscreenCanvas = useRef(null); // Canvas element whose control went to the worker
+  const decoding = useRef(false);
+  const droppedFrames = useRef(0);
+
+  const getRenderWorker = () => {
+    if (renderWorker.current) return renderWorker.current;
+    const worker = new Worker(new URL('./frameRenderer.worker.js', import.meta.url), { type: 'module' });
+    worker.onmessage = ({ data }) => {
+      if (data.type === 'rendered') {
+        decoding.current = false;
+      } else if (data.type === 'stats') {
+        // Feeds the server's adaptive frame rate
+        socket.emit('client_stats', {
+          fps: data.fps,
+          decode_ms: data.decodeMs,
+          rendered: data.rendered,
+          dropped: droppedFrames.current
+        });
+        droppedFrames.current = 0;
+      } else if (data.type === 'error') {
+        decoding.current = false;
+        console.error('Failed to render frame:', data.message);
+        setError('Failed to render camera feed');
+      }
+    };
+    renderWorker.current = worker;
+    return worker;
+  };
+
+  // Ref for the server mode canvas: hands it to the render worker once
+  const attachStreamCanvas = useCallback((canvas) => {
+    canvasRef.current = canvas;
+    if (!canvas || !WORKER_RENDERING || offscreenCanvas.current === canvas) return;
+    const offscreen = canvas.transferControlToOffscreen();
+    getRenderWorker().postMessage({ type: 'init', canvas: offscreen }, [offscreen]);
+    offscreenCanvas.current = canvas;
+    decoding.current = false;
+  }, []);
+
+  const clearStreamCanvas = () => {
+    frameQueue.current = [];
+    const canvas = canvasRef.current;
+    if (!canvas) return;
+    if (canvas === offscreenCanvas.current) {
+      renderWorker.current.postMessage({ type: 'clear' });
+    } else {
+      canvas.getContext('2d').clearRect(0, 0, canvas.width, canvas.height);
+    }
+  };
 
   const colors = [
     { name: 'Red', bg: 'bg-red-500', active: drawingState.color === 'Red' },
@@ -186,6 +261,13 @@ const MainDrawingApp = ({ onBack }) => {
   ];
 
   useEffect(() => {
+    const updateState = (state) => {
+      if (Date.now() - lastUpdate.current > 50) { // Update state every 50ms
+        setDrawingState(state);
+        lastUpdate.current = Date.now();
+      }
+    };
+
     const renderFrame = () => {
       if (frameQueue.current.length === 0) return;
       
@@ -198,10 +280,7 @@ const MainDrawingApp = ({ onBack }) => {
       img.src = frame;
       img.onload = () => {
         ctx.drawImage(img, 0, 0, canvas.width, canvas.height);
-        if (Date.now() - lastUpdate.current > 50) { // Update state every 50ms
-          setDrawingState(state);
-          lastUpdate.current = Date.now();
-        }
+        updateState(state);
       };
       img.onerror = () => {
         console.error('Failed to load frame image');
@@ -227,6 +306,16 @@ const MainDrawingApp = ({ onBack }) => {
     });
 
     socket.on('frame_update', (data) => {
+      if (canvasRef.current && canvasRef.current === offscreenCanvas.current) {
+        if (decoding.current) { // Still decoding the previous frame: skip this one
+          droppedFrames.current += 1;
+          return;
+        }
+        decoding.current = true;
+        renderWorker.current.postMessage({ type: 'frame', frame: data.frame });
+        updateState(data.state);
+        return;
+      }
       frameQueue.current.push(data);
       if (frameQueue.current.length > 3) frameQueue.current.shift(); // Limit queue to avoid backlog
       renderFrame();
@@ -236,11 +325,7 @@ const MainDrawingApp = ({ onBack }) => {
       console.log('Stream status update:', data);
       setCameraActive(data.active);
       if (!data.active) {
-        frameQueue.current = [];
-        const canvas = canvasRef.current;
-        if (canvas) {
-          canvas.getContext('2d').clearRect(0, 0, canvas.width, canvas.height);
-        }
+        clearStreamCanvas();
       }
     });
 
@@ -250,10 +335,58 @@ const MainDrawingApp = ({ onBack }) => {
       socket.off('disconnect');
       socket.off('frame_update');
       socket.off('stream_status');
+      if (renderWorker.current) {
+        renderWorker.current.terminate();
+        renderWorker.current = null;
+        offscreenCanvas.current = null;
+      }
     };
   }, []);
 
+  useEffect(() => {
+    if (captureMode !== 'browser' || !cameraActive) return;
+
+    let cancelled = false;
+    setLoading(true);
+    loadBrowserCapture()
+      .then(async (BrowserCapture) => {
+        if (cancelled || !canvasRef.current) return;
+        const capture = new BrowserCapture({
+          socket,
+          canvas: canvasRef.current,
+          onState: (state) => {
+            if (Date.now() - lastUpdate.current > 50) { // Update state every 50ms
+              setDrawingState(state);
+              lastUpdate.current = Date.now();
+            }
+          }
+        });
+        browserCapture.current = capture;
+        await capture.start();
+        if (cancelled) capture.stop(); // Stopped while the camera was opening
+      })
+      .catch((err) => {
+        setError(`Browser camera failed: ${err.message}`);
+        console.error('Browser capture error:', err);
+        setCameraActive(false);
+      })
+      .finally(() => setLoading(false));
+
+    return () => {
+      cancelled = true;
+      if (browserCapture.current) {
+        browserCapture.current.stop();
+        browserCapture.current = null;
+      }
+    };
+  }, [captureMode, cameraActive]);
+
   const startCamera = async () => {
+    if (captureMode === 'browser') {
+      setError('');
+      setCameraActive(true); // Mounts the canvas; the effect above starts capturing
+      return;
+    }
     setLoading(true);
     setError('');
     try {
@@ -279,17 +412,17 @@ const MainDrawingApp = ({ onBack }) => {
   };
 
   const stopCamera = async () => {
+    if (captureMode === 'browser') {
+      setCameraActive(false);
+      return;
+    }
     try {
       socket.emit('stop_stream');
       const response = await fetch(`${API_BASE}/stop_camera`, { method: 'POST' });
       const data = await response.json();
       if (response.ok) {
         setCameraActive(false);
-        frameQueue.current = [];
-        const canvas = canvasRef.current;
-        if (canvas) {
-          canvas.getContext('2d').clearRect(0, 0, canvas.width, canvas.height);
-        }
+        clearStreamCanvas();
         console.log('Camera stopped successfully');
       } else {
         setError(`${data.error || 'Failed to stop camera'}: ${data.details || 'No details provided'}`);
@@ -302,6 +435,10 @@ const MainDrawingApp = ({ onBack }) => {
   };
 
   const clearCanvas = async () => {
+    if (browserCapture.current) {
+      browserCapture.current.clear();
+      return;
+    }
     try {
       const response = await fetch(`${API_BASE}/clear_canvas`, { method: 'POST' });
       if (!response.ok) {
@@ -315,6 +452,10 @@ const MainDrawingApp = ({ onBack }) => {
   };
 
   const setColor = async (colorName) => {
+    if (browserCapture.current) {
+      browserCapture.current.setColor(colorName);
+      return;
+    }
     try {
       const response = await fetch(`${API_BASE}/set_color`, {
         method: 'POST',
@@ -383,6 +524,23 @@ const MainDrawingApp = ({ onBack }) => {
                 <Camera className="h-5 w-5 mr-2 text-blue-400" />
                 Camera
               </h3>
+
+              <div className="grid grid-cols-2 gap-2 mb-3">
+                {[['server', 'Server'], ['browser', 'Browser']].map(([mode, label]) => (
+                  <button
+                    key={mode}
+                    onClick={() => setCaptureMode(mode)}
+                    disabled={cameraActive}
+                    className={`py-2 rounded-lg text-sm font-medium transition-all duration-300 border ${
+                      captureMode === mode
+                        ? 'bg-blue-500/30 text-white border-blue-400/50'
+                        : 'bg-white/5 text-gray-400 border-white/10 hover:text-white'
+                    } disabled:opacity-60`}
+                  >
+                    {label} camera
+                  </button>
+                ))}
+              </div>
               
               {!cameraActive ? (
                 <button 
@@ -474,7 +632,8 @@ const MainDrawingApp = ({ onBack }) => {
               <div className="bg-black rounded-xl h-full relative overflow-hidden">
                 {cameraActive ? (
                   <canvas
-                    ref={canvasRef}
+                    key={captureMode}
+                    ref={captureMode === 'browser' ? canvasRef : attachStreamCanvas}
                     className="w-full h-full object-cover rounded-lg"
                     width={640}
                     height={480}
@@ -0,0 +1,60 @@
+// Decodes and draws streamed frames off the main thread.
+//
+// The page transfers its canvas here as an OffscreenCanvas ('init') and then
+// posts each frame_update JPEG data URL ('frame'). Frames are decoded with
+// createImageBitmap and drawn into the OffscreenCanvas; after each one the
+// worker posts 'rendered' so the page knows it can send the next. Once a
+// second it posts 'stats' with the render FPS and mean decode latency.
+
+let ctx = null;
+let rendered = 0;
+let decodeTotal = 0;
+let windowStart = performance.now();
+
+const decode = async (dataUrl) => {
+  const blob = await (await fetch(dataUrl)).blob();
+  return createImageBitmap(blob);
+};
+
+const reportStats = () => {
+  const now = performance.now();
+  const elapsed = now - windowStart;
+  if (elapsed < 1000) return;
+  self.postMessage({
+    type: 'stats',
+    fps: (rendered * 1000) / elapsed,
+    decodeMs: rendered ? decodeTotal / rendered : 0,
+    rendered,
+  });
+  rendered = 0;
+  decodeTotal = 0;
+  windowStart = now;
+};
+
+self.onmessage = async ({ data }) => {
+  if (data.type === 'init') {
+    ctx = data.canvas.getContext('2d');
+    return;
+  }
+  if (!ctx) return;
+
+  if (data.type === 'clear') {
+    ctx.clearRect(0, 0, ctx.canvas.width, ctx.canvas.height);
+    return;
+  }
+
+  if (data.type === 'frame') {
+    const start = performance.now();
+    try {
+      const bitmap = await decode(data.frame);
+      ctx.drawImage(bitmap, 0, 0, ctx.canvas.width, ctx.canvas.height);
+      bitmap.close();
+      rendered += 1;
+      decodeTotal += performance.now() - start;
+      self.postMessage({ type: 'rendered' });
+    } catch (err) {
+      self.postMessage({ type: 'error', message: err.message });
+    }
+    reportStats();
+  }
+};
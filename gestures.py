@@ -0,0 +1,117 @@
+"""Declarative gesture configuration and its compiled dispatch table.
+
+Gestures are defined in gestures.json (or the file named by GESTURE_CONFIG):
+a finger pattern, the action it triggers and that action's parameters.
+Patterns list the thumb, index, middle, ring and pinky as '1' (up), '0'
+(down) or 'x' (either), and earlier gestures win where patterns overlap.
+Parameters an action needs are checked when the config is loaded, and
+default to ACTION_PARAMS when left out.
+
+Every app compiles the gestures once at startup with its own handler per
+action into a GestureTable: 32 entries, one per finger combination. Each
+frame then costs one bitmask lookup however many gestures are configured.
+
+    table = GestureTable(load_gestures(), {'draw': on_draw, 'erase': on_erase, ...})
+    gesture, handler = table.lookup(fingers)
+    if handler is not None:
+        handler(gesture, ...)
+"""
+import json
+import math
+import os
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gestures.json')
+ACTIONS = ('draw', 'hover', 'erase', 'resize', 'next_color', 'undo')
+UNDO_DEPTH = 10  # Canvas snapshots kept for the undo action
+# Parameters the actions read, with the values used when a gesture leaves one out
+ACTION_PARAMS = {
+    'erase': {'size': 30},
+    'resize': {'min': 1, 'max': 50, 'divisor': 2},
+}
+
+
+class Gesture:
+    """One configured gesture; extra config keys become params"""
+
+    def __init__(self, name, fingers, action, cooldown=0.0, **params):
+        if action not in ACTIONS:
+            raise ValueError(f"Gesture {name!r}: unknown action {action!r}")
+        self.name = name
+        self.action = action
+        self.cooldown = float(cooldown)
+        self.params = {**ACTION_PARAMS.get(action, {}), **params}
+        for key in ACTION_PARAMS.get(action, {}):
+            value = self.params[key]
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                raise ValueError(f"Gesture {name!r}: {key} must be a positive integer, not {value!r}")
+        if action == 'resize' and self.params['min'] > self.params['max']:
+            raise ValueError(f"Gesture {name!r}: min is larger than max")
+        self.masks = pattern_masks(fingers)
+
+    def __repr__(self):
+        return f"Gesture({self.name!r}, action={self.action!r})"
+
+
+def pattern_masks(pattern):
+    """All finger bitmasks matching a pattern such as '01000' or '1xxx0'"""
+    if len(pattern) != 5 or set(pattern) - set('01x'):
+        raise ValueError(f"Invalid finger pattern {pattern!r}")
+    masks = [0]
+    for bit, finger in enumerate(pattern):
+        if finger == '1':
+            masks = [mask | 1 << bit for mask in masks]
+        elif finger == 'x':
+            masks = masks + [mask | 1 << bit for mask in masks]
+    return masks
+
+
+def fingers_mask(fingers):
+    """Bitmask of a get_fingers_up list, thumb in bit 0"""
+    return fingers[0] | fingers[1] << 1 | fingers[2] << 2 | fingers[3] << 3 | fingers[4] << 4
+
+
+def pinch_size(gesture, point, thumb):
+    """Brush size a resize gesture sets for the index and thumb tip positions"""
+    params = gesture.params
+    return max(params['min'], min(params['max'], int(math.dist(point, thumb)) // params['divisor']))
+
+
+def undo(canvas, history):
+    """Put the newest snapshot in history back on the canvas; False if there is none"""
+    if not history:
+        return False
+    previous = history.pop()
+    if previous.shape == canvas.shape:  # Snapshots from before a resolution change are dropped
+        canvas[:] = previous
+    return True
+
+
+def load_gestures(path=None):
+    """Gestures from a JSON config, by default GESTURE_CONFIG or gestures.json"""
+    path = path or os.environ.get('GESTURE_CONFIG', DEFAULT_CONFIG)
+    with open(path) as f:
+        config = json.load(f)
+    return [Gesture(**entry) for entry in config['gestures']]
+
+
+class GestureTable:
+    """Finger bitmask -> (gesture, handler) lookup compiled from a gesture list"""
+
+    def __init__(self, gestures, handlers=None):
+        handlers = handlers or {}
+        self.gestures = list(gestures)
+        self.entries = [(None, None)] * 32
+        for gesture in reversed(self.gestures):  # Earlier gestures overwrite later ones
+            for mask in gesture.masks:
+                self.entries[mask] = (gesture, handlers.get(gesture.action))
+
+    def lookup(self, fingers):
+        """(gesture, handler) for a get_fingers_up list; (None, None) if nothing matches"""
+        return self.entries[fingers_mask(fingers)]
+
+    def find(self, action):
+        """First gesture configured for an action, or None"""
+        for gesture in self.gestures:
+            if gesture.action == action:
+                return gesture
+        return None
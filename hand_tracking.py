@@ -0,0 +1,93 @@
+"""Hand identity across frames for multi-hand drawing.
+
+MediaPipe returns the hands of each frame in no particular order and without
+ids, so HandTracker matches them to the hands seen in previous frames by wrist
+position and handedness. Every tracked hand keeps its own state dict (brush,
+current stroke end point, cooldowns) so two hands - or several people - each
+draw their own continuous strokes.
+"""
+import math
+
+
+def hand_label(results, i):
+    """Handedness ('Left' or 'Right') of the i-th hand in a hands.process result"""
+    if results.multi_handedness and i < len(results.multi_handedness):
+        return results.multi_handedness[i].classification[0].label
+    return "Right"
+
+
+class HandTracker:
+    """Assigns a stable id and state to each detected hand"""
+
+    def __init__(self, max_hands=None, max_distance=0.25, max_missing=15, label_penalty=0.1):
+        if max_hands == 1:
+            # A single hand can't be confused with another, so never split its stroke
+            max_distance = float("inf")
+        self.max_distance = max_distance  # Max wrist movement per frame, in normalized units
+        self.max_missing = max_missing  # Frames a lost hand keeps its id
+        self.label_penalty = label_penalty
+        self.hands = {}
+        self.next_id = 0
+
+    def _cost(self, hand, label, wrist):
+        cost = math.dist(hand["wrist"], wrist)
+        if hand["label"] != label:
+            cost += self.label_penalty
+        return cost
+
+    def update(self, results, new_state):
+        """Match this frame's hands to tracked ones.
+
+        Returns (hand_id, hand_landmarks, label, state) per detected hand,
+        oldest hand first; new_state() builds the state of a hand seen for the
+        first time. Hands not seen this frame have their stroke ended.
+        """
+        detections = []
+        for i, hand_landmarks in enumerate(results.multi_hand_landmarks or []):
+            wrist = hand_landmarks.landmark[0]
+            detections.append((hand_landmarks, hand_label(results, i), (wrist.x, wrist.y)))
+
+        # Greedy matching, closest pairs first
+        pairs = sorted(
+            (self._cost(hand, label, wrist), hand_id, i)
+            for i, (_, label, wrist) in enumerate(detections)
+            for hand_id, hand in self.hands.items()
+        )
+        matched = {}
+        for cost, hand_id, i in pairs:
+            if cost > self.max_distance:
+                break
+            if i not in matched and hand_id not in matched.values():
+                matched[i] = hand_id
+
+        tracked = []
+        for i, (hand_landmarks, label, wrist) in enumerate(detections):
+            hand_id = matched.get(i)
+            if hand_id is None:
+                hand_id = self.next_id
+                self.next_id += 1
+                self.hands[hand_id] = {"state": new_state()}
+            hand = self.hands[hand_id]
+            hand.update(label=label, wrist=wrist, missing=0)
+            tracked.append((hand_id, hand_landmarks, label, hand["state"]))
+
+        seen = {hand_id for hand_id, _, _, _ in tracked}
+        for hand_id in list(self.hands):
+            if hand_id in seen:
+                continue
+            hand = self.hands[hand_id]
+            hand["state"]["drawing"] = False
+            hand["missing"] += 1
+            if hand["missing"] > self.max_missing:
+                del self.hands[hand_id]
+
+        tracked.sort(key=lambda item: item[0])
+        return tracked
+
+    def set_all(self, **values):
+        """Update the state of every tracked hand"""
+        for hand in self.hands.values():
+            hand["state"].update(values)
+
+    def reset(self):
+        self.hands.clear()
@@ -1,25 +1,40 @@
-# ☝️ Index only → Draw
+# ☝️ Index only → Draw (thumb closer to the index = wider, fast = thinner; brush in gestures.json)
 # ✌️ Index + Middle → Hover
 # ✋ All 5 fingers UP → Erase
 # 🤏 Pinch (thumb + index) → Adjust brush size (applies to all colors)
 # ✊ FIST (all fingers closed) → Next color
+# 🤙 Thumb + pinky → Undo the last stroke or erase
+# Gestures are configured in gestures.json (--gestures to use another file)
 # keyboard c clears canvas
 # keyboard q quits
 # Touch colors → Select specific color
+#
+# python initial.py --max-hands 2            both hands (or several people) draw, each with its own brush
+# python initial.py --source video.mp4       use a video file, image folder, 'synthetic' or tcp://host:port
+# python initial.py --record session.npz      record landmarks while drawing
+# python initial.py --replay session.npz      replay a recording (--speed 0 = as fast as possible)
+# python initial.py --replay session.npz --speed 0 --headless   benchmark without a window
+import argparse
 import cv2
-import mediapipe as mp
 import numpy as np
 import time
+from collections import deque
 
-# Mediapipe setup
-mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
-hands = mp_hands.Hands(
-    static_image_mode=False,
-    max_num_hands=1, 
-    min_detection_confidence=0.8,
-    min_tracking_confidence=0.7
-)
+from recording import LandmarkRecorder, LandmarkReplay
+from video_sources import open_source
+from hand_tracking import HandTracker
+from gestures import GestureTable, load_gestures, pinch_size, undo, UNDO_DEPTH
+from brush import make_brushes
+from model_loader import LazyHands, draw_landmarks
+
+# Mediapipe setup - the model loads in the background, see model_loader.py
+def create_hands(max_num_hands=1):
+    return LazyHands(
+        static_image_mode=False,
+        max_num_hands=max_num_hands, 
+        min_detection_confidence=0.8,
+        min_tracking_confidence=0.7
+    )
 
 # Settings
 colors = [(0, 0, 255), (0, 255, 0), (255, 0, 0), (0, 0, 0), (0, 255, 255), (0, 165, 255)]
@@ -27,28 +42,41 @@ color_names = ["Red", "Green", "Blue", "Black", "Yellow", "Orange"]
 current_color_index = 0
 brush_color = colors[current_color_index]
 brush_thickness = 3  # Global brush thickness - stays same for all colors
-min_thickness = 1
-max_thickness = 50
-eraser_size = 30
 
-# State
-drawing = False
-prev_x, prev_y = 0, 0
+# State - the brush of the longest-tracked hand; every hand also keeps its
+# own brush and stroke in its hand state
 last_color_change_time = 0  # For color change delay
 color_changed_this_frame = False  # Flag to prevent showing text when color just changed
+undo_history = deque(maxlen=UNDO_DEPTH)  # Canvases to go back to, newest last
+verbose = True  # Print color changes
+brushes = {}  # Stroke renderer per draw gesture, built in main() from the config
+
+def new_hand_state():
+    """Brush and stroke state for a newly detected hand, starting from the current brush"""
+    return {
+        'color_index': current_color_index,
+        'brush_thickness': brush_thickness,
+        'last_color_change_time': last_color_change_time,
+        'last_undo_time': 0,
+        'action': None,
+        'drawing': False,
+        'stroke': None,
+    }
 
-def get_fingers_up(lm_list):
-    """Simple finger detection for right hand"""
+def get_fingers_up(lm_list, handedness="Right"):
+    """Simple finger detection for either hand"""
     if len(lm_list) < 21:
         return [0, 0, 0, 0, 0]
     
     fingers = []
     
-    # Thumb - for right hand, thumb up means tip is to the LEFT of joint
-    if lm_list[4][0] < lm_list[3][0]:
-        fingers.append(1)
+    # Thumb - for right hand, thumb up means tip is to the LEFT of joint,
+    # for left hand to the RIGHT
+    if handedness == "Right":
+        thumb_up = lm_list[4][0] < lm_list[3][0]
     else:
-        fingers.append(0)
+        thumb_up = lm_list[4][0] > lm_list[3][0]
+    fingers.append(1 if thumb_up else 0)
     
     # Other fingers - same logic (tip higher than joint)
     for tip in [8, 12, 16, 20]:
@@ -59,10 +87,6 @@ def get_fingers_up(lm_list):
     
     return fingers
 
-def distance(p1, p2):
-    """Calculate distance between two points"""
-    return int(((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)**0.5)
-
 def select_color(x, y):
     """Check if touching color palette"""
     if 20 <= y <= 70:  # In color area
@@ -72,122 +96,205 @@ def select_color(x, y):
                 return i
     return None
 
-def main():
+# Gesture actions, called with (gesture, hand, frame, canvas, index tip,
+# thumb tip, frame time); they return True while the hand is drawing
+
+def draw_action(gesture, hand, frame, canvas, point, thumb, now):
+    x, y = point
+    hand_color = colors[hand['color_index']]
+    drawing = False
+    # Check color selection first
+    selected_color_index = select_color(x, y)
+    if selected_color_index is not None:
+        hand['color_index'] = selected_color_index
+        hand_color = colors[selected_color_index]
+        cv2.putText(frame, f"{color_names[selected_color_index]}!", (x+20, y), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
+    else:
+        # Draw - using this hand's brush thickness
+        brush = brushes[gesture.name]
+        if hand['drawing']:
+            hand['stroke'] = brush.stroke(canvas, hand['stroke'], point, thumb, hand['brush_thickness'], now, hand_color)
+        else:
+            undo_history.append(canvas.copy())
+            hand['stroke'] = brush.start(point, thumb, hand['brush_thickness'], now)
+            hand['drawing'] = True
+        drawing = True
+    
+    cv2.circle(frame, (x, y), hand['brush_thickness'], hand_color, -1)
+    return drawing
+
+def hover_action(gesture, hand, frame, canvas, point, thumb, now):
+    x, y = point
+    cv2.circle(frame, (x, y), hand['brush_thickness'], (255, 255, 255), 2)
+    cv2.putText(frame, "HOVER", (x+20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)
+    return False
+
+def erase_action(gesture, hand, frame, canvas, point, thumb, now):
+    x, y = point
+    size = gesture.params['size']
+    if hand['action'] != 'erase':
+        undo_history.append(canvas.copy())
+    cv2.circle(canvas, (x, y), size, (255, 255, 255), -1)
+    cv2.circle(frame, (x, y), size, (0, 255, 255), 2)
+    cv2.putText(frame, "ERASE", (x+20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,255), 2)
+    return False
+
+def resize_action(gesture, hand, frame, canvas, point, thumb, now):
+    x, y = point
+    # Update this hand's brush thickness
+    hand['brush_thickness'] = pinch_size(gesture, point, thumb)
+    
+    cv2.circle(frame, (x, y), hand['brush_thickness'], colors[hand['color_index']], 2)
+    cv2.putText(frame, f"SIZE: {hand['brush_thickness']}", (x+20, y), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,0), 2)
+    return False
+
+def next_color_action(gesture, hand, frame, canvas, point, thumb, now):
+    global color_changed_this_frame
+    x, y = point
+    hand_color_changed = False
+    if now - hand['last_color_change_time'] > gesture.cooldown:
+        hand['color_index'] = (hand['color_index'] + 1) % len(colors)
+        hand['last_color_change_time'] = now
+        hand_color_changed = True
+        color_changed_this_frame = True
+        if verbose:
+            print(f"{hand['handedness']} hand color changed to: {color_names[hand['color_index']]}")
+    
+    # Only show text if color didn't just change and we're still in cooldown
+    if not hand_color_changed:
+        time_remaining = gesture.cooldown - (now - hand['last_color_change_time'])
+        if time_remaining > 0:
+            cv2.putText(frame, f"CHANGING...", (x+20, y), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)  # White color
+        else:
+            cv2.putText(frame, f"FIST", (x+20, y), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)  # White color
+    return False
+
+def undo_action(gesture, hand, frame, canvas, point, thumb, now):
+    x, y = point
+    if now - hand['last_undo_time'] > gesture.cooldown and undo(canvas, undo_history):
+        hand['last_undo_time'] = now
+        if verbose:
+            print(f"Undo ({len(undo_history)} left)")
+    cv2.putText(frame, f"UNDO ({len(undo_history)})", (x+20, y), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)
+    return False
+
+ACTION_HANDLERS = {
+    'draw': draw_action,
+    'hover': hover_action,
+    'erase': erase_action,
+    'resize': resize_action,
+    'next_color': next_color_action,
+    'undo': undo_action,
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hand gesture drawing")
+    parser.add_argument("--source", default="0", help="webcam index, video file, image folder, 'synthetic' or tcp://host:port")
+    parser.add_argument("--max-hands", type=int, default=1, help="number of hands to track")
+    parser.add_argument("--record", metavar="PATH", help="save the detected landmarks to a .npz file")
+    parser.add_argument("--replay", metavar="PATH", help="drive the app from a landmark recording instead of the camera")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier, 0 = as fast as possible")
+    parser.add_argument("--headless", action="store_true", help="don't open a window (for benchmarking replays)")
+    parser.add_argument("--gestures", metavar="PATH", help="gesture config (default: GESTURE_CONFIG or gestures.json)")
+    return parser.parse_args()
+
+def main(args):
     global brush_color, current_color_index, brush_thickness
-    global drawing, prev_x, prev_y, last_color_change_time, color_changed_this_frame
+    global last_color_change_time, color_changed_this_frame, verbose, brushes
     
-    cap = cv2.VideoCapture(0)
+    verbose = not args.headless
+    # Finger pattern -> action, compiled once
+    gesture_table = GestureTable(load_gestures(args.gestures), ACTION_HANDLERS)
+    brushes = make_brushes(gesture_table.gestures)
+    
+    replay = None
+    hands = None
+    if args.replay:
+        replay = LandmarkReplay(args.replay, speed=args.speed)
+        cap = replay
+    else:
+        # Load the model while the camera opens
+        hands = create_hands(args.max_hands)
+        hands.warm_up()
+        cap = open_source(args.source)
+    hand_tracker = HandTracker(args.max_hands)
     if not cap.isOpened():
         print("Cannot open camera")
         return
     
+    recorder = None
     canvas = None
     print("Enhanced Hand Drawing App Started!")
     print("Gestures: Index=Draw, Palm=Erase, Pinch=Size, Fist=Next Color")
     
+    frame_count = 0
+    start_time = time.time()
+    
     while True:
         ret, frame = cap.read()
         if not ret:
             break
         
+        # Recorded time when replaying so the color change delay is deterministic
+        frame_time = replay.timestamp if replay is not None else time.time()
+        frame_count += 1
+        
         frame = cv2.flip(frame, 1)
         h, w = frame.shape[:2]
         
         if canvas is None:
             canvas = np.ones((h, w, 3), dtype=np.uint8) * 255
         
+        if args.record and recorder is None:
+            recorder = LandmarkRecorder((w, h))
+        
         # Reset color change flag
         color_changed_this_frame = False
         
         # Process frame
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
-        
-        current_drawing = False
-        
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Get hand points
-                lm_list = []
-                for lm in hand_landmarks.landmark:
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-                    lm_list.append((cx, cy))
-                
-                fingers = get_fingers_up(lm_list)
-                fingers_count = sum(fingers)
-                
-                if len(lm_list) >= 21:
-                    x, y = lm_list[8]  # Index finger tip
-                    thumb_x, thumb_y = lm_list[4]  # Thumb tip
-                    
-                    # 1. DRAW - Only index finger up
-                    if fingers == [0, 1, 0, 0, 0]:
-                        # Check color selection first
-                        selected_color_index = select_color(x, y)
-                        if selected_color_index is not None:
-                            current_color_index = selected_color_index
-                            brush_color = colors[current_color_index]
-                            cv2.putText(frame, f"{color_names[current_color_index]}!", (x+20, y), 
-                                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
-                        else:
-                            # Draw - using global brush_thickness
-                            if drawing:
-                                cv2.line(canvas, (prev_x, prev_y), (x, y), brush_color, brush_thickness)
-                            else:
-                                drawing = True
-                            
-                            prev_x, prev_y = x, y
-                            current_drawing = True
-                        
-                        cv2.circle(frame, (x, y), brush_thickness, brush_color, -1)
-                    
-                    # 2. HOVER - Index + Middle fingers up (no drawing)
-                    elif fingers == [0, 1, 1, 0, 0]:
-                        cv2.circle(frame, (x, y), brush_thickness, (255, 255, 255), 2)
-                        cv2.putText(frame, "HOVER", (x+20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)
-                    
-                    # 3. ERASE - All fingers up (palm open)
-                    elif fingers_count == 5:
-                        cv2.circle(canvas, (x, y), eraser_size, (255, 255, 255), -1)
-                        cv2.circle(frame, (x, y), eraser_size, (0, 255, 255), 2)
-                        cv2.putText(frame, "ERASE", (x+20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,255), 2)
-                    
-                    # 4. BRUSH SIZE - Pinch (thumb + index) - ONLY when pinching
-                    elif fingers == [1, 1, 0, 0, 0] and fingers_count == 2:
-                        pinch_distance = distance((thumb_x, thumb_y), (x, y))
-                        # Update global brush thickness
-                        brush_thickness = max(min_thickness, min(max_thickness, pinch_distance // 2))
-                        
-                        cv2.circle(frame, (x, y), brush_thickness, brush_color, 2)
-                        cv2.putText(frame, f"SIZE: {brush_thickness}", (x+20, y), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,0), 2)
-                    
-                    # 5. COLOR CYCLE - All fingers closed (fist)
-                    elif fingers_count == 0:  # All fingers down (fist)
-                        current_time = time.time()
-                        if current_time - last_color_change_time > 1.0:  # 1 second delay
-                            current_color_index = (current_color_index + 1) % len(colors)
-                            brush_color = colors[current_color_index]
-                            last_color_change_time = current_time
-                            color_changed_this_frame = True
-                            print(f"Color changed to: {color_names[current_color_index]}")
-                        
-                        # Only show text if color didn't just change and we're still in cooldown
-                        if not color_changed_this_frame:
-                            time_remaining = 1.0 - (current_time - last_color_change_time)
-                            if time_remaining > 0:
-                                cv2.putText(frame, f"CHANGING...", (x+20, y), 
-                                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)  # White color
-                            else:
-                                cv2.putText(frame, f"FIST", (x+20, y), 
-                                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)  # White color
-                
-                # Show hand landmarks
-                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-        
-        # Stop drawing when finger lifted
-        if not current_drawing and drawing:
-            drawing = False
+        results = replay.process(rgb) if replay is not None else hands.process(rgb)
+        if recorder is not None:
+            recorder.add(frame_time, results)
+        
+        tracked_hands = hand_tracker.update(results, new_hand_state)
+        
+        for hand_id, hand_landmarks, handedness, hand in tracked_hands:
+            # Get hand points
+            lm_list = []
+            for lm in hand_landmarks.landmark:
+                cx, cy = int(lm.x * w), int(lm.y * h)
+                lm_list.append((cx, cy))
+            
+            fingers = get_fingers_up(lm_list, handedness)
+            gesture, action = gesture_table.lookup(fingers)
+            hand['handedness'] = handedness
+            current_drawing = False
+            
+            if len(lm_list) >= 21 and action is not None:
+                # Index finger tip and thumb tip
+                current_drawing = action(gesture, hand, frame, canvas, lm_list[8], lm_list[4], frame_time)
+            hand['action'] = gesture.action if gesture is not None else None
+            
+            # Show hand landmarks
+            draw_landmarks(frame, hand_landmarks)
+            
+            # Stop drawing when finger lifted
+            if not current_drawing:
+                hand['drawing'] = False
+        
+        # The longest-tracked hand's brush is shown in the UI and inherited by new hands
+        if tracked_hands:
+            primary = tracked_hands[0][3]
+            current_color_index = primary['color_index']
+            brush_color = colors[current_color_index]
+            brush_thickness = primary['brush_thickness']
+            last_color_change_time = primary['last_color_change_time']
         
         # Combine frame with canvas
         gray = cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY)
@@ -222,6 +329,9 @@ def main():
         cv2.putText(result, "INDEX: Draw | PALM: Erase | PINCH: Size | FIST: Next Color", 
                    (10, h-30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,255), 1)
         
+        if args.headless:
+            continue
+        
         cv2.imshow("Enhanced Hand Drawing", result)
         
         # Keyboard controls
@@ -229,12 +339,21 @@ def main():
         if key == ord('q'):
             break
         elif key == ord('c'):
+            undo_history.append(canvas)
             canvas = np.ones((h, w, 3), dtype=np.uint8) * 255
             print("Canvas cleared")
     
     cap.release()
-    cv2.destroyAllWindows()
+    if not args.headless:
+        cv2.destroyAllWindows()
+    
+    elapsed = time.time() - start_time
+    if frame_count and elapsed > 0:
+        print(f"{frame_count} frames in {elapsed:.2f}s ({frame_count / elapsed:.1f} FPS)")
+    if recorder is not None:
+        recorder.save(args.record)
+        print(f"Saved {len(recorder)} frames of landmarks to {args.record}")
     print("Application closed")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(parse_args())
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""Lazy, warm-started MediaPipe Hands models.
+
+Importing mediapipe takes most of a second and the first hands.process call
+pays the graph and delegate initialization, so building Hands at import time
+delays startup and the first frame. LazyHands defers both: warm_up() imports
+mediapipe, builds the model and runs one dummy inference on a background
+thread, and process() blocks only if it is called before that has finished.
+
+    hands = LazyHands(max_num_hands=2, min_detection_confidence=0.8)
+    hands.warm_up()       # at boot, returns immediately
+    ...
+    results = hands.process(rgb)
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COLD = 'cold'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+# First imports of mediapipe modules from several threads at once (two
+# warm-ups and a replay, say) can trip Python's import deadlock detection
+MEDIAPIPE_IMPORT_LOCK = threading.Lock()
+
+
+class LazyHands:
+    """mp.solutions.hands.Hands built on a background thread"""
+
+    def __init__(self, warmup_size=(640, 480), **options):
+        self.options = options
+        self.warmup_size = warmup_size
+        self.state = COLD
+        self.error = None
+        self.load_seconds = None
+        self._hands = None
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+
+    def warm_up(self):
+        """Start loading in the background; no-op once loading or loaded"""
+        with self._lock:
+            if self.state not in (COLD, FAILED):
+                return
+            self.state = LOADING
+            self.error = None
+            self._loaded.clear()
+        threading.Thread(target=self._load, name='hands-warmup', daemon=True).start()
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            with MEDIAPIPE_IMPORT_LOCK:
+                import mediapipe as mp
+            hands = mp.solutions.hands.Hands(**self.options)
+            width, height = self.warmup_size
+            hands.process(np.zeros((height, width, 3), dtype=np.uint8))
+        except Exception as e:
+            logger.error(f'Hands model failed to load: {e}')
+            self.error = str(e)
+            self.state = FAILED
+        else:
+            self._hands = hands
+            self.load_seconds = time.perf_counter() - start
+            self.state = READY
+            logger.info(f'Hands model ready in {self.load_seconds:.2f}s')
+        finally:
+            self._loaded.set()
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    def wait(self, timeout=None):
+        """Block until loaded (starting the warm-up if needed); True if ready"""
+        self.warm_up()
+        self._loaded.wait(timeout)
+        return self.ready
+
+    def process(self, image):
+        if self._hands is None and not self.wait():
+            raise RuntimeError(f'Hands model unavailable: {self.error}')
+        return self._hands.process(image)
+
+    def status(self):
+        return {'state': self.state, 'load_seconds': self.load_seconds, 'error': self.error}
+
+    def close(self):
+        if self.state == LOADING:
+            self._loaded.wait()
+        if self._hands is not None:
+            self._hands.close()
+            self._hands = None
+        self.state = COLD
+
+
+def draw_landmarks(image, hand_landmarks):
+    """mp_draw.draw_landmarks with the hand connections, importing mediapipe on first use"""
+    with MEDIAPIPE_IMPORT_LOCK:
+        from mediapipe.python.solutions import drawing_utils, hands
+    drawing_utils.draw_landmarks(image, hand_landmarks, hands.HAND_CONNECTIONS)
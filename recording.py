@@ -0,0 +1,136 @@
+"""Record hands.process landmarks to a compact .npz file and replay them.
+
+A recording stores only what the gesture logic consumes - the 21 normalized
+landmarks and handedness of every detected hand plus the frame timestamp -
+so a session of several minutes is a few hundred kilobytes instead of a video.
+LandmarkReplay then stands in for both the camera and the Hands model so the
+gesture and drawing code runs unchanged, at the original or any other speed.
+"""
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from model_loader import MEDIAPIPE_IMPORT_LOCK
+
+NUM_LANDMARKS = 21
+HAND_LABELS = ["Left", "Right"]
+
+
+class LandmarkRecorder:
+    """Collects hands.process results frame by frame"""
+
+    def __init__(self, frame_size):
+        self.frame_size = frame_size  # (width, height)
+        self.timestamps = []
+        self.counts = []
+        self.landmarks = []
+        self.handedness = []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def add(self, timestamp, results):
+        """Append the hands found in one frame"""
+        hands_found = results.multi_hand_landmarks or []
+        self.timestamps.append(timestamp)
+        self.counts.append(len(hands_found))
+        for i, hand_landmarks in enumerate(hands_found):
+            self.landmarks.append([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark])
+            label = "Right"
+            if results.multi_handedness:
+                label = results.multi_handedness[i].classification[0].label
+            self.handedness.append(HAND_LABELS.index(label))
+
+    def save(self, path):
+        """Write the recording as a compressed .npz file"""
+        np.savez_compressed(
+            path,
+            timestamps=np.array(self.timestamps, dtype=np.float64),
+            counts=np.array(self.counts, dtype=np.uint8),
+            landmarks=np.array(self.landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3),
+            handedness=np.array(self.handedness, dtype=np.uint8),
+            frame_size=np.array(self.frame_size, dtype=np.int32),
+        )
+
+
+class LandmarkReplay:
+    """Plays a recording back through the cv2.VideoCapture and Hands APIs.
+
+    read() returns a blank frame of the recorded size, paced by the recorded
+    timestamps divided by `speed` (0 means as fast as possible), and process()
+    returns the landmarks recorded for that frame. `timestamp` holds the
+    recorded time of the current frame so time-based gestures replay exactly.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False):
+        data = np.load(path)
+        self.timestamps = data["timestamps"]
+        self.landmarks = data["landmarks"]
+        self.handedness = data["handedness"]
+        self.offsets = np.concatenate(([0], np.cumsum(data["counts"], dtype=np.int64)))
+        self.width, self.height = (int(v) for v in data["frame_size"])
+        self.speed = speed
+        self.loop = loop
+        self.index = -1
+        self.timestamp = 0.0
+        self.loop_offset = 0.0
+        self.start_wall = None
+        self.opened = len(self.timestamps) > 0
+        self.blank = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self.opened = False
+
+    def read(self):
+        if not self.opened:
+            return False, None
+
+        next_index = self.index + 1
+        if next_index >= len(self.timestamps):
+            if not self.loop:
+                self.opened = False
+                return False, None
+            # Keep time monotonic across loops so cooldowns behave
+            self.loop_offset += self.timestamps[-1] - self.timestamps[0] + 1.0 / 30
+            next_index = 0
+        self.index = next_index
+        self.timestamp = float(self.timestamps[next_index]) + self.loop_offset
+
+        if self.speed > 0:
+            elapsed = self.timestamp - self.timestamps[0]
+            if self.start_wall is None:
+                self.start_wall = time.time() - elapsed / self.speed
+            delay = self.start_wall + elapsed / self.speed - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        return True, self.blank.copy()
+
+    def process(self, image):
+        """Return the recorded results for the frame last returned by read()"""
+        # Imported here so loading recording.py doesn't pull in all of mediapipe
+        with MEDIAPIPE_IMPORT_LOCK:
+            from mediapipe.framework.formats import classification_pb2, landmark_pb2
+
+        start, end = self.offsets[self.index], self.offsets[self.index + 1]
+        if start == end:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+        multi_hand_landmarks = []
+        multi_handedness = []
+        for i in range(start, end):
+            multi_hand_landmarks.append(landmark_pb2.NormalizedLandmarkList(landmark=[
+                landmark_pb2.NormalizedLandmark(x=x, y=y, z=z) for x, y, z in self.landmarks[i].tolist()
+            ]))
+            hand_index = int(self.handedness[i])
+            multi_handedness.append(classification_pb2.ClassificationList(classification=[
+                classification_pb2.Classification(index=hand_index, score=1.0, label=HAND_LABELS[hand_index])
+            ]))
+        return SimpleNamespace(multi_hand_landmarks=multi_hand_landmarks, multi_handedness=multi_handedness)
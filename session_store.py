@@ -0,0 +1,209 @@
+"""Memory-bounded storage for the canvases of sessions that aren't drawing.
+
+A session's canvas and undo history are 900 KB per 640x480 image while
+resident. SessionStore keeps them resident only while they are in use:
+
+- after idle_timeout seconds without get/put, a session is compressed to
+  PNG in memory; mostly-white drawings shrink 100-200x
+- while resident plus compressed bytes exceed memory_budget, the least
+  recently used sessions are compressed first, then moved to disk
+- get() rehydrates a session from wherever it is, so nothing is lost
+- sessions unused for expire_after seconds are dropped altogether
+
+    store = SessionStore(idle_timeout=60, memory_budget=256 * 2**20)
+    store.put(session_id, canvas, undo_history)
+    canvas, history = store.get(session_id)
+    store.metrics()   # resident/compressed/on-disk sessions and bytes
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+
+RESIDENT = 'resident'
+COMPRESSED = 'compressed'
+ON_DISK = 'on_disk'
+PNG_LEVEL = 6
+
+
+def compress_images(images):
+    """PNG bytes for each image; None entries stay None"""
+    return [None if image is None else cv2.imencode('.png', image, [cv2.IMWRITE_PNG_COMPRESSION, PNG_LEVEL])[1].tobytes()
+            for image in images]
+
+
+def decompress_images(blobs):
+    return [None if blob is None else cv2.imdecode(np.frombuffer(blob, np.uint8), cv2.IMREAD_UNCHANGED)
+            for blob in blobs]
+
+
+class Session:
+    """One session's canvas and history, in whichever form it is kept"""
+
+    def __init__(self, canvas, history, now):
+        self.canvas = canvas
+        self.history = list(history)
+        self.blobs = None  # PNG bytes of [canvas, *history] when compressed
+        self.path = None  # File holding the blobs when on disk
+        self.state = RESIDENT
+        self.last_used = now
+        self.nbytes = self.resident_bytes()
+
+    def resident_bytes(self):
+        return sum(image.nbytes for image in [self.canvas, *self.history] if image is not None)
+
+
+class SessionStore:
+    """Canvases and undo histories by session id, compressed when idle"""
+
+    def __init__(self, idle_timeout=60.0, memory_budget=256 * 2**20, spill_dir=None,
+                 expire_after=24 * 3600.0, clock=time.monotonic):
+        self.idle_timeout = idle_timeout
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.temp_dir = None  # Spill directory created here, removed by close()
+        self.expire_after = expire_after
+        self.clock = clock
+        self.sessions = {}
+        self.lock = threading.RLock()
+        self.counters = {'compressions': 0, 'rehydrations': 0, 'spills': 0, 'expired': 0}
+        self.sweeper = None
+
+    def put(self, session_id, canvas, history=()):
+        """Store a session's canvas (or None) and undo history, replacing what was there"""
+        with self.lock:
+            self._delete(session_id)
+            self.sessions[session_id] = Session(canvas, history, self.clock())
+            self._enforce_budget()
+
+    def get(self, session_id):
+        """(canvas, history) of a session, rehydrated if needed; (None, []) if unknown"""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None, []
+            if session.state != RESIDENT:
+                self._rehydrate(session)
+            session.last_used = self.clock()
+            self._enforce_budget(keep=session)
+            return session.canvas, list(session.history)
+
+    def pop(self, session_id):
+        """Like get(), and the caller takes the session over until it puts it back"""
+        with self.lock:
+            canvas, history = self.get(session_id)
+            self._delete(session_id)
+            return canvas, history
+
+    def discard(self, session_id):
+        with self.lock:
+            self._delete(session_id)
+
+    def sweep(self):
+        """Compress idle sessions, drop expired ones and enforce the memory budget"""
+        now = self.clock()
+        with self.lock:
+            for session_id, session in list(self.sessions.items()):
+                idle = now - session.last_used
+                if self.expire_after is not None and idle > self.expire_after:
+                    self._delete(session_id)
+                    self.counters['expired'] += 1
+                elif session.state == RESIDENT and idle > self.idle_timeout:
+                    self._compress(session)
+            self._enforce_budget()
+
+    def start(self, interval=10.0):
+        """Sweep every `interval` seconds on a daemon thread"""
+        def run():
+            while True:
+                time.sleep(interval)
+                self.sweep()
+
+        with self.lock:
+            if self.sweeper is None:
+                self.sweeper = threading.Thread(target=run, name='session-sweeper', daemon=True)
+                self.sweeper.start()
+
+    def metrics(self):
+        with self.lock:
+            counts = {RESIDENT: 0, COMPRESSED: 0, ON_DISK: 0}
+            nbytes = {RESIDENT: 0, COMPRESSED: 0, ON_DISK: 0}
+            for session in self.sessions.values():
+                counts[session.state] += 1
+                nbytes[session.state] += session.nbytes
+            return {
+                'sessions': len(self.sessions),
+                'resident': counts[RESIDENT],
+                'compressed': counts[COMPRESSED],
+                'on_disk': counts[ON_DISK],
+                'resident_bytes': nbytes[RESIDENT],
+                'compressed_bytes': nbytes[COMPRESSED],
+                'on_disk_bytes': nbytes[ON_DISK],
+                'memory_bytes': nbytes[RESIDENT] + nbytes[COMPRESSED],
+                'memory_budget': self.memory_budget,
+                **self.counters,
+            }
+
+    def _memory_bytes(self):
+        return sum(s.nbytes for s in self.sessions.values() if s.state != ON_DISK)
+
+    def _compress(self, session):
+        session.blobs = compress_images([session.canvas, *session.history])
+        session.canvas, session.history = None, []
+        session.state = COMPRESSED
+        session.nbytes = sum(len(blob) for blob in session.blobs if blob is not None)
+        self.counters['compressions'] += 1
+
+    def _spill(self, session):
+        if self.spill_dir is None:
+            self.spill_dir = self.temp_dir = tempfile.mkdtemp(prefix='gesture-sessions-')
+        fd, session.path = tempfile.mkstemp(suffix='.session', dir=self.spill_dir)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(session.blobs, f)
+        session.blobs = None
+        session.state = ON_DISK
+        self.counters['spills'] += 1
+
+    def _rehydrate(self, session):
+        if session.state == ON_DISK:
+            with open(session.path, 'rb') as f:
+                session.blobs = pickle.load(f)
+            os.remove(session.path)
+            session.path = None
+        images = decompress_images(session.blobs)
+        session.canvas, session.history = images[0], images[1:]
+        session.blobs = None
+        session.state = RESIDENT
+        session.nbytes = session.resident_bytes()
+        self.counters['rehydrations'] += 1
+
+    def _enforce_budget(self, keep=None):
+        """Compress, then spill, least recently used sessions until under budget"""
+        if self._memory_bytes() <= self.memory_budget:
+            return
+        by_age = sorted((s for s in self.sessions.values() if s is not keep), key=lambda s: s.last_used)
+        for state, demote in ((RESIDENT, self._compress), (COMPRESSED, self._spill)):
+            for session in by_age:
+                if self._memory_bytes() <= self.memory_budget:
+                    return
+                if session.state == state:
+                    demote(session)
+
+    def _delete(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is not None and session.path is not None:
+            os.remove(session.path)
+
+    def close(self):
+        """Drop every session, including the ones on disk"""
+        with self.lock:
+            for session_id in list(self.sessions):
+                self._delete(session_id)
+            if self.temp_dir is not None:
+                shutil.rmtree(self.temp_dir, ignore_errors=True)
+                self.spill_dir = self.temp_dir = None
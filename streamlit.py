@@ -3,9 +3,21 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import time
+import threading
+from collections import deque
 from PIL import Image
 import io
 import base64
+import os
+import uuid
+import streamlit.components.v1 as components
+
+from video_sources import open_source
+from hand_tracking import HandTracker
+from model_loader import LazyHands
+from gestures import GestureTable, load_gestures, pinch_size, undo, UNDO_DEPTH
+from brush import make_brushes
+from session_store import SessionStore
 
 # Configure page
 st.set_page_config(
@@ -69,49 +81,103 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'canvas' not in st.session_state:
-    st.session_state.canvas = None
-if 'drawing' not in st.session_state:
-    st.session_state.drawing = False
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 if 'current_color_index' not in st.session_state:
     st.session_state.current_color_index = 0
 if 'brush_thickness' not in st.session_state:
     st.session_state.brush_thickness = 5
 if 'camera_active' not in st.session_state:
     st.session_state.camera_active = False
+if 'video_source' not in st.session_state:
+    st.session_state.video_source = "0"
+if 'max_hands' not in st.session_state:
+    st.session_state.max_hands = 1
+if 'worker' not in st.session_state:
+    st.session_state.worker = None
+if 'capture_mode' not in st.session_state:
+    st.session_state.capture_mode = "Server camera"
 
-# Initialize MediaPipe
-@st.cache_resource
-def initialize_mediapipe():
-    mp_hands = mp.solutions.hands
-    mp_draw = mp.solutions.drawing_utils
-    hands = mp_hands.Hands(
+# Initialize MediaPipe - each capture worker owns its Hands instance, since
+# one instance can't process frames for several sessions at once
+mp_hands = mp.solutions.hands
+mp_draw = mp.solutions.drawing_utils
+
+def create_hands(max_num_hands=1):
+    return LazyHands(
         static_image_mode=False,
-        max_num_hands=1,
+        max_num_hands=max_num_hands,
         min_detection_confidence=0.8,
         min_tracking_confidence=0.7
     )
-    return mp_hands, mp_draw, hands
-
-mp_hands, mp_draw, hands = initialize_mediapipe()
 
 # Drawing settings
 colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (0, 0, 0), (255, 255, 0), (255, 165, 0)]
 color_names = ["Red", "Green", "Blue", "Black", "Yellow", "Orange"]
 color_hex = ["#FF0000", "#00FF00", "#0000FF", "#000000", "#FFFF00", "#FFA500"]
 
-def get_fingers_up(lm_list):
-    """Simple finger detection for right hand"""
+DISPLAY_FPS = 30  # Max rate frames are pushed to the browser
+WORKER_IDLE_TIMEOUT = 10.0  # Seconds without a reader before a worker stops
+
+# Canvases and undo histories of sessions without a running worker, for all
+# sessions of this server: compressed after SESSION_IDLE_TIMEOUT seconds and
+# kept under SESSION_MEMORY_MB, the least recently used going to disk first
+SESSION_IDLE_TIMEOUT = float(os.environ.get("GESTURE_SESSION_IDLE", "60"))
+SESSION_MEMORY_MB = float(os.environ.get("GESTURE_SESSION_BUDGET_MB", "256"))
+
+@st.cache_resource
+def get_session_store():
+    store = SessionStore(
+        idle_timeout=SESSION_IDLE_TIMEOUT,
+        memory_budget=int(SESSION_MEMORY_MB * 2**20),
+        spill_dir=os.environ.get("GESTURE_SESSION_DIR")
+    )
+    store.start()
+    return store
+
+session_store = get_session_store()
+
+# Browser capture mode: the page's own camera is sent to the Flask backend for
+# landmark detection, and drawing happens in the browser
+BACKEND_URL = os.environ.get("GESTURE_BACKEND_URL", "http://localhost:5000")
+
+def browser_capture_html(backend_url):
+    return f"""
+    <canvas id="view" width="640" height="480" style="width: 100%; border-radius: 8px; background: #000;"></canvas>
+    <div style="display: flex; justify-content: space-between; align-items: center; font-family: sans-serif;">
+        <span id="status">Starting camera...</span>
+        <button id="clear">Clear Canvas</button>
+    </div>
+    <script src="https://cdn.socket.io/4.8.1/socket.io.min.js"></script>
+    <script src="{backend_url}/static/browser_capture.js"></script>
+    <script>
+        const status = document.getElementById('status');
+        const capture = new BrowserCapture({{
+            socket: io('{backend_url}', {{ transports: ['websocket'] }}),
+            canvas: document.getElementById('view'),
+            onState: (state) => {{
+                status.textContent = `${{state.gesture}} | ${{state.color}} | ${{state.brush_size}}px`;
+            }},
+        }});
+        capture.start().catch((err) => {{ status.textContent = `Camera error: ${{err.message}}`; }});
+        document.getElementById('clear').onclick = () => capture.clear();
+    </script>
+    """
+
+def get_fingers_up(lm_list, handedness="Right"):
+    """Simple finger detection for either hand"""
     if len(lm_list) < 21:
         return [0, 0, 0, 0, 0]
     
     fingers = []
     
-    # Thumb - for right hand, thumb up means tip is to the LEFT of joint
-    if lm_list[4][0] < lm_list[3][0]:
-        fingers.append(1)
+    # Thumb - for right hand, thumb up means tip is to the LEFT of joint,
+    # for left hand to the RIGHT
+    if handedness == "Right":
+        thumb_up = lm_list[4][0] < lm_list[3][0]
     else:
-        fingers.append(0)
+        thumb_up = lm_list[4][0] > lm_list[3][0]
+    fingers.append(1 if thumb_up else 0)
     
     # Other fingers - same logic (tip higher than joint)
     for tip in [8, 12, 16, 20]:
@@ -122,12 +188,65 @@ def get_fingers_up(lm_list):
     
     return fingers
 
-def distance(p1, p2):
-    """Calculate distance between two points"""
-    return int(((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)**0.5)
+# Gesture actions, called with (gesture, hand, frame, canvas, index tip,
+# thumb tip, worker); they return the status label. Color and size come
+# from the worker, which the sidebar also sets.
+
+def draw_action(gesture, hand, frame, canvas, point, thumb, brush):
+    x, y = point
+    brush_color = colors[brush.color_index]
+    stroke_brush = brushes[gesture.name]
+    if hand["drawing"]:
+        hand["stroke"] = stroke_brush.stroke(canvas, hand["stroke"], point, thumb,
+                                             brush.brush_thickness, time.time(), brush_color)
+    else:
+        brush.undo_history.append(canvas.copy())
+        hand["stroke"] = stroke_brush.start(point, thumb, brush.brush_thickness, time.time())
+    
+    hand["drawing"] = True
+    cv2.circle(frame, (x, y), brush.brush_thickness, brush_color, -1)
+    return "✏️ Drawing"
+
+def hover_action(gesture, hand, frame, canvas, point, thumb, brush):
+    cv2.circle(frame, point, brush.brush_thickness, (255, 255, 255), 2)
+    return "👆 Hovering"
+
+def erase_action(gesture, hand, frame, canvas, point, thumb, brush):
+    size = gesture.params["size"]
+    if hand["action"] != "erase":
+        brush.undo_history.append(canvas.copy())
+    cv2.circle(canvas, point, size, (255, 255, 255), -1)
+    cv2.circle(frame, point, size, (0, 255, 255), 2)
+    return "🧽 Erasing"
+
+def resize_action(gesture, hand, frame, canvas, point, thumb, brush):
+    brush.brush_thickness = pinch_size(gesture, point, thumb)
+    cv2.circle(frame, point, brush.brush_thickness, colors[brush.color_index], 2)
+    return f"📏 Sizing ({brush.brush_thickness}px)"
+
+def next_color_action(gesture, hand, frame, canvas, point, thumb, brush):
+    # Colors are picked in the sidebar
+    return "🎨 Ready to Change Color"
+
+def undo_action(gesture, hand, frame, canvas, point, thumb, brush):
+    now = time.time()
+    if now - hand["last_undo_time"] > gesture.cooldown and undo(canvas, brush.undo_history):
+        hand["last_undo_time"] = now
+    return f"↩️ Undo ({len(brush.undo_history)} left)"
 
-def process_frame(frame, canvas):
-    """Process frame with hand detection and drawing"""
+# Finger pattern -> action, compiled once from gestures.json (or GESTURE_CONFIG)
+gesture_table = GestureTable(load_gestures(), {
+    "draw": draw_action,
+    "hover": hover_action,
+    "erase": erase_action,
+    "resize": resize_action,
+    "next_color": next_color_action,
+    "undo": undo_action
+})
+brushes = make_brushes(gesture_table.gestures)
+
+def process_frame(frame, canvas, hands, brush):
+    """Process frame with hand detection and drawing, using the worker's brush"""
     frame = cv2.flip(frame, 1)
     h, w = frame.shape[:2]
     
@@ -138,65 +257,35 @@ def process_frame(frame, canvas):
     results = hands.process(rgb)
     
     gesture_info = {"gesture": "No Hand Detected", "confidence": 0.0}
+    gestures = []
     
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            # Get hand points
-            lm_list = []
-            for lm in hand_landmarks.landmark:
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                lm_list.append((cx, cy))
-            
-            fingers = get_fingers_up(lm_list)
-            fingers_count = sum(fingers)
-            
-            if len(lm_list) >= 21:
-                x, y = lm_list[8]  # Index finger tip
-                thumb_x, thumb_y = lm_list[4]  # Thumb tip
-                
-                # Gesture recognition and drawing logic
-                if fingers == [0, 1, 0, 0, 0]:
-                    # Drawing mode
-                    brush_color = colors[st.session_state.current_color_index]
-                    if st.session_state.drawing:
-                        cv2.line(canvas, (st.session_state.prev_x, st.session_state.prev_y), 
-                               (x, y), brush_color, st.session_state.brush_thickness)
-                    
-                    st.session_state.prev_x, st.session_state.prev_y = x, y
-                    st.session_state.drawing = True
-                    cv2.circle(frame, (x, y), st.session_state.brush_thickness, brush_color, -1)
-                    gesture_info = {"gesture": "✏️ Drawing", "confidence": 1.0}
-                
-                elif fingers == [0, 1, 1, 0, 0]:
-                    # Hover mode
-                    cv2.circle(frame, (x, y), st.session_state.brush_thickness, (255, 255, 255), 2)
-                    gesture_info = {"gesture": "👆 Hovering", "confidence": 1.0}
-                    st.session_state.drawing = False
-                
-                elif fingers_count == 5:
-                    # Erase mode
-                    cv2.circle(canvas, (x, y), 30, (255, 255, 255), -1)
-                    cv2.circle(frame, (x, y), 30, (0, 255, 255), 2)
-                    gesture_info = {"gesture": "🧽 Erasing", "confidence": 1.0}
-                    st.session_state.drawing = False
-                
-                elif fingers == [1, 1, 0, 0, 0] and fingers_count == 2:
-                    # Brush size adjustment
-                    pinch_distance = distance((thumb_x, thumb_y), (x, y))
-                    st.session_state.brush_thickness = max(1, min(50, pinch_distance // 2))
-                    cv2.circle(frame, (x, y), st.session_state.brush_thickness, colors[st.session_state.current_color_index], 2)
-                    gesture_info = {"gesture": f"📏 Sizing ({st.session_state.brush_thickness}px)", "confidence": 1.0}
-                    st.session_state.drawing = False
-                
-                elif fingers_count == 0:
-                    # Color change mode
-                    gesture_info = {"gesture": "🎨 Ready to Change Color", "confidence": 1.0}
-                    st.session_state.drawing = False
-            
-            # Draw hand landmarks
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-    else:
-        st.session_state.drawing = False
+    # Each hand keeps its own stroke; color and size come from the sidebar
+    tracked_hands = brush.hand_tracker.update(
+        results, lambda: {"drawing": False, "stroke": None, "action": None, "last_undo_time": 0}
+    )
+    
+    for hand_id, hand_landmarks, handedness, hand in tracked_hands:
+        # Get hand points
+        lm_list = []
+        for lm in hand_landmarks.landmark:
+            cx, cy = int(lm.x * w), int(lm.y * h)
+            lm_list.append((cx, cy))
+        
+        fingers = get_fingers_up(lm_list, handedness)
+        gesture, action = gesture_table.lookup(fingers)
+        
+        if len(lm_list) >= 21 and action is not None:
+            # Index finger tip and thumb tip
+            gestures.append(action(gesture, hand, frame, canvas, lm_list[8], lm_list[4], brush))
+        if gesture is None or gesture.action != "draw":
+            hand["drawing"] = False
+        hand["action"] = gesture.action if gesture is not None else None
+        
+        # Draw hand landmarks
+        mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+    
+    if gestures:
+        gesture_info = {"gesture": " | ".join(gestures), "confidence": 1.0}
     
     # Combine frame with canvas
     gray = cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY)
@@ -209,6 +298,99 @@ def process_frame(frame, canvas):
     
     return result, canvas, gesture_info
 
+class CaptureWorker:
+    """Captures and processes frames on a background thread.
+
+    The script thread only picks up the latest processed frame, so capture
+    runs at camera rate however fast the browser is updated. The worker stops
+    by itself when nothing has read from it for WORKER_IDLE_TIMEOUT seconds
+    (e.g. the browser tab was closed). It takes the session's canvas and undo
+    history out of the session store and puts them back when it stops.
+    """
+    
+    def __init__(self, source, max_hands, color_index, brush_thickness, session_id):
+        self.source = source
+        self.max_hands = max_hands
+        self.color_index = color_index
+        self.brush_thickness = brush_thickness
+        self.hand_tracker = HandTracker(max_hands)
+        self.session_id = session_id
+        self.canvas, history = session_store.pop(session_id)
+        self.undo_history = deque(history, maxlen=UNDO_DEPTH)  # Canvases to go back to, newest last
+        self.clear_requested = False
+        self.frame = None
+        self.frame_id = 0
+        self.gesture_info = {"gesture": "No Hand Detected", "confidence": 0.0}
+        self.error = None
+        self.running = True
+        self.last_polled = time.time()
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def run(self):
+        hands = cap = None
+        try:
+            # Load the model while the camera opens
+            hands = create_hands(self.max_hands)
+            hands.warm_up()
+            cap = open_source(self.source)
+            if not cap.isOpened():
+                self.error = "Cannot access camera. Please check your camera permissions."
+                return
+            
+            while self.running and time.time() - self.last_polled < WORKER_IDLE_TIMEOUT:
+                ret, frame = cap.read()
+                if not ret:
+                    self.error = "Failed to access camera"
+                    break
+                
+                canvas = self.canvas
+                if self.clear_requested:
+                    if canvas is not None:
+                        self.undo_history.append(canvas)
+                    canvas = None
+                    self.clear_requested = False
+                processed_frame, canvas, gesture_info = process_frame(frame, canvas, hands, self)
+                rgb_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
+                
+                with self.condition:
+                    self.canvas = canvas
+                    self.frame = rgb_frame
+                    self.frame_id += 1
+                    self.gesture_info = gesture_info
+                    self.condition.notify_all()
+        except OSError as e:  # e.g. nothing listening on a tcp:// source
+            self.error = f"Video source failed: {e}"
+        finally:
+            # The session goes back to the store however the worker ends
+            with self.condition:
+                session_store.put(self.session_id, self.canvas, self.undo_history)
+                self.running = False
+                self.condition.notify_all()
+            if cap is not None:
+                cap.release()
+            if hands is not None:
+                hands.close()
+    
+    def latest(self, after_id, timeout=1.0):
+        """Wait for a frame newer than after_id; returns (frame_id, frame, gesture_info)"""
+        with self.condition:
+            self.last_polled = time.time()
+            self.condition.wait_for(lambda: self.frame_id > after_id or not self.running, timeout)
+            return self.frame_id, self.frame, self.gesture_info
+    
+    def clear_canvas(self):
+        self.clear_requested = True
+    
+    def canvas_snapshot(self):
+        with self.condition:
+            return None if self.canvas is None else self.canvas.copy()
+    
+    def stop(self):
+        self.running = False
+        self.thread.join(timeout=2.0)
+
 # Header
 st.markdown("""
 <div class="main-header">
@@ -233,8 +415,32 @@ with st.sidebar:
     with camera_col2:
         if st.button("⏹️ Stop Camera"):
             st.session_state.camera_active = False
+            if st.session_state.worker is not None:
+                st.session_state.worker.stop()
+                st.session_state.worker = None
             st.rerun()
     
+    st.number_input(
+        "Max Hands",
+        min_value=1,
+        max_value=4,
+        key="max_hands",
+        help="Track several hands; each draws its own strokes"
+    )
+    
+    st.radio(
+        "Capture Mode",
+        ["Server camera", "Browser camera"],
+        key="capture_mode",
+        help="Browser camera captures in this page and sends frames to the backend at GESTURE_BACKEND_URL"
+    )
+    
+    st.text_input(
+        "Video Source",
+        key="video_source",
+        help="Webcam index, video file, image folder, 'synthetic' or tcp://host:port"
+    )
+    
     # Color palette
     st.markdown("#### 🎨 Color Palette")
     selected_color = st.selectbox(
@@ -246,6 +452,8 @@ with st.sidebar:
     
     if selected_color != st.session_state.current_color_index:
         st.session_state.current_color_index = selected_color
+        if st.session_state.worker is not None:
+            st.session_state.worker.color_index = selected_color
     
     # Color preview
     st.markdown(f"""
@@ -258,20 +466,33 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
     
-    # Brush settings
+    # Brush settings - the pinch gesture changes the worker's brush size
     st.markdown("#### 🖌️ Brush Settings")
+    if st.session_state.worker is not None:
+        st.session_state.brush_thickness = st.session_state.worker.brush_thickness
     brush_size = st.slider("Brush Size", 1, 50, st.session_state.brush_thickness)
+    if brush_size != st.session_state.brush_thickness and st.session_state.worker is not None:
+        st.session_state.worker.brush_thickness = brush_size
     st.session_state.brush_thickness = brush_size
     
     # Clear canvas
     st.markdown("#### 🗑️ Actions")
     if st.button("Clear Canvas", type="secondary"):
-        st.session_state.canvas = None
+        if st.session_state.worker is not None:
+            st.session_state.worker.clear_canvas()
+        else:
+            canvas, history = session_store.get(st.session_state.session_id)
+            if canvas is not None:  # Kept for undo, as when clearing while drawing
+                session_store.put(st.session_state.session_id, None, (history + [canvas])[-UNDO_DEPTH:])
         st.success("Canvas cleared!")
     
     # Download canvas
-    if st.session_state.canvas is not None:
-        canvas_pil = Image.fromarray(cv2.cvtColor(st.session_state.canvas, cv2.COLOR_BGR2RGB))
+    if st.session_state.worker is not None:
+        canvas = st.session_state.worker.canvas_snapshot()
+    else:
+        canvas, _ = session_store.get(st.session_state.session_id)
+    if canvas is not None:
+        canvas_pil = Image.fromarray(cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB))
         buf = io.BytesIO()
         canvas_pil.save(buf, format="PNG")
         st.download_button(
@@ -287,42 +508,24 @@ col1, col2 = st.columns([2, 1])
 with col1:
     st.markdown("### 📺 Live Camera Feed")
     
-    if st.session_state.camera_active:
-        # Placeholder for camera feed
+    video_placeholder = None
+    if st.session_state.camera_active and st.session_state.capture_mode == "Browser camera":
+        # Camera, gestures and canvas all live in the component
+        if st.session_state.worker is not None:
+            st.session_state.worker.stop()
+            st.session_state.worker = None
+        components.html(browser_capture_html(BACKEND_URL), height=540)
+    elif st.session_state.camera_active:
+        # Start capturing in the background; frames are published at the end of the script
+        if st.session_state.worker is None:
+            st.session_state.worker = CaptureWorker(
+                st.session_state.video_source,
+                st.session_state.max_hands,
+                st.session_state.current_color_index,
+                st.session_state.brush_thickness,
+                st.session_state.session_id
+            )
         video_placeholder = st.empty()
-        
-        # Initialize camera
-        cap = cv2.VideoCapture(0)
-        
-        if cap.isOpened():
-            while st.session_state.camera_active:
-                ret, frame = cap.read()
-                if not ret:
-                    st.error("Failed to access camera")
-                    break
-                
-                # Process frame
-                processed_frame, st.session_state.canvas, gesture_info = process_frame(frame, st.session_state.canvas)
-                
-                # Convert to RGB for display
-                rgb_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-                video_placeholder.image(rgb_frame, channels="RGB", use_column_width=True)
-                
-                # Update gesture info in sidebar
-                with col2:
-                    st.markdown("### 👋 Gesture Status")
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h4>{gesture_info['gesture']}</h4>
-                        <p>Confidence: {gesture_info['confidence']:.1%}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                time.sleep(0.1)  # Control frame rate
-        else:
-            st.error("Cannot access camera. Please check your camera permissions.")
-        
-        cap.release()
     else:
         st.info("👆 Click 'Start Camera' to begin drawing with hand gestures!")
         
@@ -340,14 +543,20 @@ with col1:
         """, unsafe_allow_html=True)
 
 with col2:
+    status_placeholder = None
+    if video_placeholder is not None:
+        st.markdown("### 👋 Gesture Status")
+        status_placeholder = st.empty()
+    
     st.markdown("### 🎯 Gesture Guide")
     
     gestures = [
-        ("✏️ Draw", "Index finger only", "#28a745"),
+        ("✏️ Draw", "Index finger only; thumb nearer = wider line", "#28a745"),
         ("👆 Hover", "Index + Middle fingers", "#17a2b8"),
         ("🧽 Erase", "Open palm (all fingers)", "#ffc107"),
         ("📏 Resize", "Pinch (thumb + index)", "#fd7e14"),
-        ("🎨 Color", "Closed fist", "#6f42c1")
+        ("🎨 Color", "Closed fist", "#6f42c1"),
+        ("↩️ Undo", "Thumb + pinky", "#dc3545")
     ]
     
     for gesture, description, color in gestures:
@@ -368,6 +577,12 @@ with col2:
     with metrics_col2:
         st.metric("Brush Size", f"{st.session_state.brush_thickness}px")
     
+    stored = session_store.metrics()
+    st.caption(
+        f"Stored canvases: {stored['resident']} resident, {stored['compressed']} compressed, "
+        f"{stored['on_disk']} on disk - {stored['memory_bytes'] / 2**20:.1f} of {SESSION_MEMORY_MB:.0f} MB"
+    )
+    
     # Camera status
     camera_status = "🟢 Active" if st.session_state.camera_active else "🔴 Inactive"
     st.markdown(f"""
@@ -384,4 +599,38 @@ st.markdown("""
     <p>🎨 <strong>AI Hand Drawing Studio</strong> - Create art with the power of computer vision!</p>
     <p><small>Built with Streamlit, OpenCV, and MediaPipe</small></p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Publish the worker's frames until the camera is stopped. Widget interaction
+# interrupts this loop with a rerun; only the two placeholders are updated and
+# the status card only when the gesture changes, so the page doesn't grow.
+if video_placeholder is not None:
+    worker = st.session_state.worker
+    frame_id = 0
+    shown_info = None
+    next_publish = time.time()
+    
+    while worker.running:
+        frame_id, frame, gesture_info = worker.latest(frame_id)
+        if frame is None:
+            continue
+        
+        video_placeholder.image(frame, channels="RGB", use_column_width=True)
+        
+        if gesture_info != shown_info:
+            status_placeholder.markdown(f"""
+            <div class="metric-card">
+                <h4>{gesture_info['gesture']}</h4>
+                <p>Confidence: {gesture_info['confidence']:.1%}</p>
+            </div>
+            """, unsafe_allow_html=True)
+            shown_info = gesture_info
+        
+        # Cap the browser update rate; frames in between are dropped, not queued
+        next_publish = max(next_publish + 1.0 / DISPLAY_FPS, time.time())
+        time.sleep(max(0, next_publish - time.time()))
+    
+    if worker.error:
+        video_placeholder.error(worker.error)
+    st.session_state.worker = None
+    st.session_state.camera_active = False
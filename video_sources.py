@@ -0,0 +1,303 @@
+"""Pluggable video sources for the drawing apps.
+
+open_source() turns a source spec into an object with the cv2.VideoCapture
+read()/isOpened()/set()/release() interface:
+
+    "0", "1"            webcam index
+    "video.mp4"         video file
+    "frames/"           directory of images, played in name order
+    "synthetic"         generated test pattern, no camera needed
+    "tcp://host:port"   JPEG stream served by serve_stream() (local stand-in
+                        for an RTSP/IP camera)
+
+Capture and decoding run on a background thread (PrefetchSource) so the
+processing loop only ever picks up ready frames.
+
+    python video_sources.py serve video.mp4 --port 8554
+"""
+import argparse
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+DEFAULT_STREAM_PORT = 8554
+
+
+class PacedSource:
+    """Base for non-live sources that deliver frames at a fixed rate (fps=0 = unpaced)"""
+
+    live = False
+
+    def __init__(self, fps):
+        self.fps = fps
+        self.next_time = None
+        self.opened = True
+
+    def wait(self):
+        if not self.fps:
+            return
+        now = time.time()
+        if self.next_time is None:
+            self.next_time = now
+        delay = self.next_time - now
+        if delay > 0:
+            time.sleep(delay)
+        self.next_time = max(self.next_time + 1.0 / self.fps, now)
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self.opened = False
+
+
+class FileSource(PacedSource):
+    """Video file played at its own frame rate"""
+
+    def __init__(self, path, fps=None, loop=False):
+        self.capture = cv2.VideoCapture(path)
+        if fps is None:
+            fps = self.capture.get(cv2.CAP_PROP_FPS) or 30
+        super().__init__(fps)
+        self.loop = loop
+        self.opened = self.capture.isOpened()
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        ret, frame = self.capture.read()
+        if not ret and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+        if not ret:
+            self.opened = False  # End of the file
+            return False, None
+        self.wait()
+        return True, frame
+
+    def release(self):
+        self.opened = False
+        self.capture.release()
+
+
+class ImageFolderSource(PacedSource):
+    """Images in a directory, played in name order"""
+
+    def __init__(self, path, fps=30, loop=True):
+        super().__init__(fps)
+        self.paths = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.loop = loop
+        self.index = 0
+        self.opened = len(self.paths) > 0
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        if self.index >= len(self.paths):
+            if not self.loop:
+                self.opened = False
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        if frame is None:
+            return False, None
+        self.wait()
+        return True, frame
+
+
+class SyntheticSource(PacedSource):
+    """Generated test pattern: a gradient with a moving dot and frame counter"""
+
+    def __init__(self, width=640, height=480, fps=30):
+        super().__init__(fps)
+        self.width = width
+        self.height = height
+        self.frame_number = 0
+        gradient = np.linspace(40, 200, width, dtype=np.uint8)
+        self.background = np.dstack([np.tile(gradient, (height, 1))] * 3)
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        frame = self.background.copy()
+        t = self.frame_number / 30.0
+        x = int(self.width / 2 + self.width / 3 * np.cos(t))
+        y = int(self.height / 2 + self.height / 3 * np.sin(t))
+        cv2.circle(frame, (x, y), 20, (0, 0, 255), -1)
+        cv2.putText(frame, str(self.frame_number), (10, self.height - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        self.frame_number += 1
+        self.wait()
+        return True, frame
+
+
+class NetworkSource:
+    """Client for the length-prefixed JPEG stream sent by serve_stream()"""
+
+    live = True
+
+    def __init__(self, host, port, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.opened = True
+
+    def _recv_exact(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("stream closed")
+            data.extend(chunk)
+        return bytes(data)
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        try:
+            (size,) = struct.unpack("!I", self._recv_exact(4))
+            payload = self._recv_exact(size)
+        except (OSError, ConnectionError):
+            self.release()
+            return False, None
+        frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return frame is not None, frame
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        if self.opened:
+            self.opened = False
+            self.sock.close()
+
+
+class PrefetchSource:
+    """Reads and decodes frames from another source on a background thread.
+
+    Live sources keep only the newest frames (stale ones are dropped), other
+    sources block the reader thread so no frame is skipped.
+    """
+
+    def __init__(self, source, queue_size=2):
+        self.source = source
+        self.live = getattr(source, "live", True)
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while self.running:
+            ret, frame = self.source.read()
+            if not ret:
+                break
+            if self.live and self.frames.full():
+                try:
+                    self.frames.get_nowait()
+                except queue.Empty:
+                    pass
+            while self.running:
+                try:
+                    self.frames.put(frame, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+        self.running = False
+
+    def read(self):
+        while True:
+            try:
+                return True, self.frames.get(timeout=0.1)
+            except queue.Empty:
+                if not self.running:
+                    return False, None
+
+    def isOpened(self):
+        # Closed once the reader thread has stopped and its frames are taken
+        return (self.running and self.source.isOpened()) or not self.frames.empty()
+
+    def set(self, prop, value):
+        return self.source.set(prop, value)
+
+    def release(self):
+        self.running = False
+        self.thread.join(timeout=1.0)
+        self.source.release()
+
+
+def open_source(spec, width=None, height=None, loop=False, prefetch=True):
+    """Open a video source from a spec string (see module docstring)"""
+    spec = str(spec).strip()
+
+    if spec.isdigit():
+        source = cv2.VideoCapture(int(spec))
+        if width and height:
+            source.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            source.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    elif spec == "synthetic":
+        source = SyntheticSource(width or 640, height or 480)
+    elif spec.startswith("tcp://"):
+        host, _, port = spec[len("tcp://"):].partition(":")
+        source = NetworkSource(host or "127.0.0.1", int(port or DEFAULT_STREAM_PORT))
+    elif os.path.isdir(spec):
+        source = ImageFolderSource(spec, loop=loop)
+    else:
+        source = FileSource(spec, loop=loop)
+
+    if prefetch and source.isOpened():
+        source = PrefetchSource(source)
+    return source
+
+
+def serve_stream(spec, host="127.0.0.1", port=DEFAULT_STREAM_PORT, jpeg_quality=80):
+    """Serve a source as a JPEG stream; each client gets its own looping copy"""
+    def send_frames(conn):
+        source = open_source(spec, loop=True, prefetch=False)
+        try:
+            while True:
+                ret, frame = source.read()
+                if not ret:
+                    break
+                _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+                conn.sendall(struct.pack("!I", len(buffer)) + buffer.tobytes())
+        except OSError:
+            pass
+        finally:
+            source.release()
+            conn.close()
+
+    server = socket.create_server((host, port))
+    print(f"Serving {spec} on tcp://{host}:{port}")
+    try:
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=send_frames, args=(conn,), daemon=True).start()
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Video source utilities")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="serve a source as a local network stream")
+    serve_parser.add_argument("source", help="webcam index, video file, image folder or 'synthetic'")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_STREAM_PORT)
+    args = parser.parse_args()
+    serve_stream(args.source, args.host, args.port)